@@ -85,13 +85,65 @@ def draw_line(p_list, algorithm):
     return result
 
 
+def fill_polygon_spans(p_list, y_start=None, y_stop=None):
+    """扫描线填充多边形（边表 + 活性边表，奇偶规则）
+
+    像素 (x, y) 被填充当且仅当点 (x, y) 在多边形内部；每条边在y方向上按 [y_min, y_max) 计入，
+    因此顶点不会被重复计数，凹多边形和自交多边形都能正确处理
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
+    :param y_start: (int) 可选，只计算 y >= y_start 的扫描线
+    :param y_stop: (int) 可选，只计算 y < y_stop 的扫描线
+    :return: (list of list of int: [[y, x_left, x_right], ...]) 按y递增排列的水平区间，x_left、x_right均包含在内
+    """
+    # 边表：起始扫描线 -> [[x_num, dy, dx, y_max], ...]，当前扫描线上边的x坐标为 x_num / dy
+    edge_table = {}
+    for i in range(len(p_list)):
+        x0, y0 = p_list[i - 1]
+        x1, y1 = p_list[i]
+        if y0 == y1:
+            continue  # 水平边不与扫描线相交
+        if y0 > y1:
+            x0, y0, x1, y1 = x1, y1, x0, y0
+        edge = [x0 * (y1 - y0), y1 - y0, x1 - x0, y1]
+        if y_start is not None and y0 < y_start:
+            # 从第一条需要的扫描线开始，x坐标相应地前移
+            edge[0] += (y_start - y0) * (x1 - x0)
+            y0 = y_start
+        edge_table.setdefault(y0, []).append(edge)
+    res = []
+    if not edge_table:
+        return res
+    active = []
+    y = min(edge_table)
+    y_end = max(edge[3] for edges in edge_table.values() for edge in edges)
+    if y_stop is not None:
+        y_end = min(y_end, y_stop)
+    while y < y_end:
+        active.extend(edge_table.get(y, []))
+        active = [edge for edge in active if edge[3] > y]
+        active.sort(key=lambda edge: edge[0] / edge[1])
+        for left, right in zip(active[::2], active[1::2]):
+            x_left = -(-left[0] // left[1])    # ceil
+            x_right = right[0] // right[1]     # floor
+            if x_left <= x_right:
+                res.append([y, x_left, x_right])
+        for edge in active:
+            edge[0] += edge[2]
+        y = y + 1
+    return res
+
+
 def draw_polygon(p_list, algorithm):
     """绘制多边形
 
     :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
-    :param algorithm: (string) 绘制使用的算法，包括'DDA'和'Bresenham'
+    :param algorithm: (string) 绘制使用的算法，包括'DDA'、'Bresenham'和'Scanline'（扫描线填充）
     :return: (list of list of int: [[x_0, y_0], [x_1, y_1], [x_2, y_2], ...]) 绘制结果的像素点坐标列表
     """
+    if algorithm == 'Scanline':
+        return [(x, y) for y, x_left, x_right in fill_polygon_spans(p_list)
+                for x in range(x_left, x_right + 1)]
     result = []
     for i in range(len(p_list)):
         line = draw_line([p_list[i - 1], p_list[i]], algorithm)
@@ -103,9 +155,11 @@ def draw_polygon_gui(p_list, algorithm):
     """绘制多边形 in gui
 
     :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
-    :param algorithm: (string) 绘制使用的算法，包括'DDA'和'Bresenham'
+    :param algorithm: (string) 绘制使用的算法，包括'DDA'、'Bresenham'和'Scanline'（扫描线填充）
     :return: (list of list of int: [[x_0, y_0], [x_1, y_1], [x_2, y_2], ...]) 绘制结果的像素点坐标列表
     """
+    if algorithm == 'Scanline':
+        return draw_polygon(p_list, algorithm)
     result = []
     for i in range(len(p_list) - 1):
         line = draw_line([p_list[i], p_list[i + 1]], algorithm)
@@ -180,6 +234,53 @@ def draw_ellipse(p_list):
     return res
 
 
+def ellipse_quadrant(rx, ry):
+    """中点椭圆生成算法（只使用整数运算）计算第一象限内的点
+
+    判别式统一乘以4以消去 rx_sq / 4 和 (x + 0.5)，取值与draw_ellipse中的浮点判别式同号，因此生成的点完全相同
+
+    :param rx: (int) x方向半轴长
+    :param ry: (int) y方向半轴长
+    :return: (list of list of int: [[x_0, y_0], [x_1, y_1], ...]) 相对椭圆中心的偏移，包括两个轴上的端点，不含重复点
+    """
+    flag = False  # 焦点是否在y轴上
+    if rx < ry:
+        rx, ry = ry, rx
+        flag = True
+    x = 0
+    y = ry
+    ry_sq = ry * ry
+    rx_sq = rx * rx
+    res = []
+    p1 = 4 * ry_sq - 4 * rx_sq * ry + rx_sq
+    while ry_sq * x < rx_sq * y:
+        # section 1
+        res.append([x, y])
+        if p1 < 0:
+            p1 = p1 + 8 * ry_sq * x + 12 * ry_sq
+        else:
+            p1 = p1 + 8 * ry_sq * x - 8 * rx_sq * y + 8 * rx_sq + 12 * ry_sq
+            y = y - 1
+        x = x + 1
+
+    p2 = ry_sq * (2 * x + 1) * (2 * x + 1) + 4 * rx_sq * \
+        (y - 1) * (y - 1) - 4 * rx_sq * ry_sq
+    while y > 0:
+        # section 2
+        res.append([x, y])
+        if p2 >= 0:
+            p2 = p2 - 8 * rx_sq * y + 12 * rx_sq
+        else:
+            p2 = p2 + 8 * ry_sq * x - 8 * rx_sq * y + 8 * ry_sq + 12 * rx_sq
+            x = x + 1
+        y = y - 1
+
+    res.append([rx, 0])
+    if flag:
+        res = [[yk, xk] for xk, yk in res]
+    return res
+
+
 def Bezier_Point(t, p_list):
     """针对某个t值计算出对应点
 
@@ -384,6 +485,9 @@ def clip(p_list, x_min, y_min, x_max, y_max, algorithm):
                         x = x0 + (x1 - x0) * (y_min - y0) / (y1 - y0)
                     code[i] = encode(x_min, y_min, x_max, y_max, x, y)
                     res[i] = [int(x), int(y)]
+                    # 每移动一个端点就检查一次，否则两个端点可能在窗口角落外交替移动而无法结束
+                    if code[0] & code[1] != 0:
+                        return []
 
     elif algorithm == 'Liang-Barsky':
         dx = x1 - x0
@@ -0,0 +1,691 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+# cg_algorithms 只允许依赖math库，这里放基于NumPy的向量化实现，
+# 结果与cg_algorithms中的纯Python参考实现保持一致
+import math
+from functools import lru_cache
+import numpy as np
+import cg_algorithms
+
+
+def _empty_pixels():
+    return np.empty((0, 2), dtype=np.int64)
+
+
+def _ragged_index(counts):
+    """把每段的像素个数展开成 (段号, 段内序号)
+
+    :param counts: (np.ndarray of int, shape (N,)) 每段的像素个数
+    :return: (offsets, seg, step) offsets长度为N+1，seg和step长度为像素总数
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    seg = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(offsets[-1], dtype=np.int64) - offsets[seg]
+    return offsets, seg, step
+
+
+# _dda_accumulate每次最多展开的表格元素个数
+_DDA_CHUNK = 1 << 20
+
+
+def _dda_accumulate(start, delta, lo, hi, offsets):
+    """逐段累加 start + delta + delta + ...，与DDA中逐步相加的浮点结果逐位相同，只输出第 [lo, hi) 步
+
+    为了逐位相同，第lo步之前的累加不能跳过，时间与hi成正比；表格按列分块展开，
+    块与块之间只保留上一块最后一列的累加值，因此内存与线段长度无关。
+    按hi分桶后对每个桶做二维的 add.accumulate，补齐带来的浪费不超过两倍
+    """
+    out = np.empty(offsets[-1], dtype=np.float64)
+    nonempty = hi > lo
+    bucket = np.zeros(len(hi), dtype=np.int64)
+    bucket[nonempty] = np.ceil(np.log2(hi[nonempty])).astype(np.int64)
+    for b in np.unique(bucket[nonempty]):
+        rows = np.flatnonzero((bucket == b) & nonempty)
+        acc = start[rows].astype(np.float64)
+        width = int(hi[rows].max())
+        columns = max(1, _DDA_CHUNK // len(rows))
+        for c0 in range(0, width, columns):
+            # 已经输出完的段不再累加
+            active = hi[rows] > c0
+            rows, acc = rows[active], acc[active]
+            c1 = min(c0 + columns, width)
+            table = np.empty((len(rows), c1 - c0))
+            table[:] = delta[rows, None]
+            if c0 == 0:
+                table[:, 0] = acc
+            else:
+                table[:, 0] += acc
+            np.add.accumulate(table, axis=1, out=table)
+            acc = table[:, -1].copy()
+            row_lo = lo[rows]
+            if not (row_lo < c1).any():
+                continue
+            column = np.arange(c0, c1)
+            r, c = np.nonzero((column >= row_lo[:, None]) & (column < hi[rows][:, None]))
+            out[offsets[rows[r]] + column[c] - row_lo[r]] = table[r, c]
+    return out
+
+
+def _liang_barsky(x0, y0, x1, y1, x_min, y_min, x_max, y_max):
+    """Liang-Barsky算法中每条线段在窗口内的参数范围
+
+    :return: (u0, u1, visible) 线段上参数在 [u0, u1] 内的部分位于窗口内，visible为False表示完全在窗口外
+    """
+    dx = x1 - x0
+    dy = y1 - y0
+    p = np.stack((-dx, dx, -dy, dy), axis=1)
+    q = np.stack((x0 - x_min, x_max - x0, y0 - y_min, y_max - y0), axis=1)
+    parallel = p == 0
+    u = q / np.where(parallel, 1, p)
+    u0 = np.max(np.where(p < 0, u, 0), axis=1, initial=0)
+    u1 = np.min(np.where(p > 0, u, 1), axis=1, initial=1)
+    visible = ~np.any(parallel & (q < 0), axis=1) & (u0 <= u1)
+    return u0, u1, visible
+
+
+def _visible_steps(x0, y0, x1, y1, length, count, window):
+    """第i步的像素与理想直线上参数 u = i / length 的点相差不到一个像素，
+    据此求出每条线段可能落在窗口内的步数范围 [lo, hi)，范围外的步不必计算
+    """
+    margin = 2
+    x_min, y_min, x_max, y_max = window
+    u0, u1, visible = _liang_barsky(x0, y0, x1, y1, x_min - margin, y_min - margin,
+                                    x_max + margin, y_max + margin)
+    lo = np.maximum(np.floor(u0 * length).astype(np.int64) - 1, 0)
+    hi = np.minimum(np.ceil(u1 * length).astype(np.int64) + 2, count)
+    hi = np.where(visible, np.maximum(hi, lo), lo)
+    return lo, hi
+
+
+def draw_lines(segments, algorithm, window=None):
+    """批量绘制线段
+
+    :param segments: (array-like of int, shape (N, 2, 2)) N条线段的起点和终点坐标
+    :param algorithm: (string) 绘制使用的算法，包括'Naive'、'DDA'和'Bresenham'
+    :param window: (tuple of int: (x_min, y_min, x_max, y_max)) 可选，只计算可能落在该窗口内的那部分像素，
+        窗口内的像素与不加窗口时完全相同，窗口附近可能多出少量窗口外的像素（'Naive'不做裁剪）
+    :return: (pixels, offsets) pixels为 (M, 2) 的像素坐标数组，第i条线段的像素为 pixels[offsets[i]:offsets[i + 1]]，
+        其内容与 cg_algorithms.draw_line 的结果相同
+    """
+    seg_arr = np.asarray(segments, dtype=np.int64).reshape(-1, 2, 2)
+    x0 = seg_arr[:, 0, 0]
+    y0 = seg_arr[:, 0, 1]
+    x1 = seg_arr[:, 1, 0]
+    y1 = seg_arr[:, 1, 1]
+    dx = np.abs(x1 - x0)
+    dy = np.abs(y1 - y0)
+    if algorithm == 'Naive':
+        vertical = x0 == x1
+        counts = np.where(vertical, np.maximum(y1 - y0 + 1, 0), dx + 1)
+        offsets, seg, step = _ragged_index(counts)
+        # 非竖直线段统一成从左到右
+        swap = x0 > x1
+        sx0 = np.where(swap, x1, x0)
+        sy0 = np.where(swap, y1, y0)
+        sx1 = np.where(swap, x0, x1)
+        sy1 = np.where(swap, y0, y1)
+        k = (sy1 - sy0) / np.where(vertical, 1, sx1 - sx0)
+        v = vertical[seg]
+        x = np.where(v, x0[seg], sx0[seg] + step)
+        y_slope = (sy0[seg] + k[seg] * step).astype(np.int64)
+        y = np.where(v, y0[seg] + step, y_slope)
+    elif algorithm == 'DDA':
+        length = np.maximum(dx, dy)
+        lo = np.zeros_like(length)
+        hi = length
+        if window is not None:
+            lo, hi = _visible_steps(x0, y0, x1, y1, length, length, window)
+        offsets = np.zeros(len(length) + 1, dtype=np.int64)
+        np.cumsum(hi - lo, out=offsets[1:])
+        safe = np.maximum(length, 1)
+        x = _dda_accumulate(x0 + 0.5, (x1 - x0) / safe, lo, hi, offsets).astype(np.int64)
+        y = _dda_accumulate(y0 + 0.5, (y1 - y0) / safe, lo, hi, offsets).astype(np.int64)
+    elif algorithm == 'Bresenham':
+        # flag: 以y为主方向，与cg_algorithms.draw_line中交换x、y的做法一致
+        flag = dx < dy
+        major = np.where(flag, dy, dx)
+        minor = np.where(flag, dx, dy)
+        counts = major + 1
+        lo = np.zeros_like(counts)
+        if window is not None:
+            lo, hi = _visible_steps(x0, y0, x1, y1, major, counts, window)
+            counts = hi - lo
+        offsets, seg, step = _ragged_index(counts)
+        step = step + lo[seg]
+        t_major = np.where(np.where(flag, y1 - y0, x1 - x0) > 0, 1, -1)
+        t_minor = np.where(np.where(flag, x1 - x0, y1 - y0) > 0, 1, -1)
+        m = major[seg]
+        # 第i步之前次方向累计前进的次数，等价于逐步更新误差项e
+        minor_step = (2 * minor[seg] * step + m) // np.maximum(2 * m, 1)
+        a = np.where(flag, y0, x0)[seg] + t_major[seg] * step
+        b = np.where(flag, x0, y0)[seg] + t_minor[seg] * minor_step
+        f = flag[seg]
+        x = np.where(f, b, a)
+        y = np.where(f, a, b)
+    else:
+        return _empty_pixels(), np.zeros(len(seg_arr) + 1, dtype=np.int64)
+    return np.column_stack((x, y)).astype(np.int64), offsets
+
+
+def draw_line(p_list, algorithm):
+    """绘制线段（向量化版本）
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1]]) 线段的起点和终点坐标
+    :param algorithm: (string) 绘制使用的算法，包括'Naive'、'DDA'和'Bresenham'
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标，与cg_algorithms.draw_line的像素集合相同
+    """
+    if len(p_list) != 2:
+        return _empty_pixels()
+    pixels, _ = draw_lines([p_list], algorithm)
+    return pixels
+
+
+def polygon_edges(p_list):
+    """多边形的各条边，顺序与 cg_algorithms.draw_polygon 相同
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
+    :return: (np.ndarray of int, shape (N, 2, 2)) 第i条边为 [p_list[i - 1], p_list[i]]
+    """
+    p_arr = np.asarray(p_list, dtype=np.int64).reshape(-1, 2)
+    return np.stack((np.roll(p_arr, 1, axis=0), p_arr), axis=1)
+
+
+def fill_polygon(p_list, window=None):
+    """扫描线填充多边形，把cg_algorithms.fill_polygon_spans得到的水平区间一次展开成像素
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
+    :param window: (tuple of int: (x_min, y_min, x_max, y_max)) 可选，只输出窗口内的像素
+    :return: (np.ndarray of int, shape (N, 2)) 填充区域的像素点坐标
+    """
+    if window is None:
+        spans = cg_algorithms.fill_polygon_spans(p_list)
+    else:
+        spans = cg_algorithms.fill_polygon_spans(p_list, window[1], window[3] + 1)
+    spans = np.array(spans, dtype=np.int64).reshape(-1, 3)
+    if window is not None:
+        spans[:, 1] = np.maximum(spans[:, 1], window[0])
+        spans[:, 2] = np.minimum(spans[:, 2], window[2])
+        spans = spans[spans[:, 1] <= spans[:, 2]]
+    _, seg, step = _ragged_index(spans[:, 2] - spans[:, 1] + 1)
+    return np.column_stack((spans[seg, 1] + step, spans[seg, 0]))
+
+
+def draw_polygon(p_list, algorithm):
+    """绘制多边形（向量化版本），所有边在一次 draw_lines 调用中完成
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 多边形的顶点坐标列表
+    :param algorithm: (string) 绘制使用的算法，包括'DDA'、'Bresenham'和'Scanline'（扫描线填充）
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标
+    """
+    if algorithm == 'Scanline':
+        return fill_polygon(p_list)
+    pixels, _ = draw_lines(polygon_edges(p_list), algorithm)
+    return pixels
+
+
+@lru_cache(maxsize=4096)
+def ellipse_offsets(rx, ry):
+    """半轴长为 (rx, ry) 的椭圆上所有像素相对中心的偏移，只与半轴长有关，因此按 (rx, ry) 缓存
+
+    :return: (np.ndarray of int, shape (N, 2)) 由第一象限的点对称得到，不含重复点
+    """
+    quadrant = np.array(cg_algorithms.ellipse_quadrant(rx, ry), dtype=np.int64)
+    reflected = (quadrant[None] * np.array([[[1, 1]], [[-1, 1]], [[1, -1]], [[-1, -1]]])).reshape(-1, 2)
+    offsets = np.unique(reflected, axis=0)
+    offsets.setflags(write=False)
+    return offsets
+
+
+def draw_ellipse(p_list):
+    """绘制椭圆（整数中点椭圆生成算法，向量化版本）
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1]]) 椭圆的矩形包围框左上角和右下角顶点坐标
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标，与cg_algorithms.draw_ellipse的像素集合相同，不含重复点
+    """
+    x0, y0 = (int(v) for v in p_list[0])
+    x1, y1 = (int(v) for v in p_list[1])
+    center = np.array([(x0 + x1) // 2, (y0 + y1) // 2], dtype=np.int64)
+    return ellipse_offsets(abs(x1 - x0) // 2, abs(y1 - y0) // 2) + center
+
+
+@lru_cache(maxsize=None)
+def _binomial_row(n):
+    """第n行二项式系数 C(n, 0..n)，只计算一次"""
+    row = np.array([math.comb(n, i) for i in range(n + 1)], dtype=np.float64)
+    row.setflags(write=False)
+    return row
+
+
+# 超过这个次数时二项式系数无法用float64表示（C(1030, 515)已接近上限），改在对数空间计算Bernstein基函数
+_MAX_EXACT_DEGREE = 1000
+
+
+@lru_cache(maxsize=None)
+def _log_binomial_row(n):
+    """第n行二项式系数的自然对数 ln C(n, 0..n)"""
+    row = np.array([math.lgamma(n + 1) - math.lgamma(i + 1) - math.lgamma(n - i + 1)
+                    for i in range(n + 1)])
+    row.setflags(write=False)
+    return row
+
+
+def _parameter_range(step, stop):
+    """与 while t <= stop: ...; t = t + step 逐步累加得到的参数序列完全相同"""
+    steps = np.full(int(stop / step) + 2, step)
+    steps[0] = 0.0
+    t = np.add.accumulate(steps)
+    return t[t <= stop]
+
+
+def bezier_points(p_list, t):
+    """用Bernstein基函数一次计算所有参数t对应的Bezier曲线上的点
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表
+    :param t: (np.ndarray of float, shape (T,)) 参数，取值范围[0, 1]
+    :return: (np.ndarray of float, shape (T, 2)) 曲线上的点，计算量与控制点个数成线性关系
+    """
+    ctrl = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    n = len(ctrl) - 1
+    t = np.asarray(t, dtype=np.float64).reshape(-1, 1)
+    i = np.arange(n + 1)
+    if n <= _MAX_EXACT_DEGREE:
+        basis = _binomial_row(n) * t ** i * (1 - t) ** (n - i)
+        return basis @ ctrl
+    # 在对数空间中计算 C(n, i) * t^i * (1-t)^(n-i)，指数为0的项在t为0或1时取0而不是nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_t = np.where(i == 0, 0.0, i * np.log(t))
+        log_u = np.where(i == n, 0.0, (n - i) * np.log1p(-t))
+    basis = np.exp(_log_binomial_row(n) + log_t + log_u)
+    return basis @ ctrl
+
+
+def _split_bezier(ctrl):
+    """de Casteljau算法在t=0.5处把一批Bezier曲线各分成两段
+
+    :param ctrl: (np.ndarray of float, shape (K, n+1, 2)) K段曲线的控制点
+    :return: (left, right) 两个形状与ctrl相同的数组
+    """
+    n = ctrl.shape[1] - 1
+    left = np.empty_like(ctrl)
+    right = np.empty_like(ctrl)
+    level = ctrl
+    for j in range(n + 1):
+        left[:, j] = level[:, 0]
+        right[:, n - j] = level[:, -1]
+        level = (level[:, :-1] + level[:, 1:]) * 0.5
+    return left, right
+
+
+def _flatness(ctrl):
+    """各段曲线的控制点到弦（首末点之间的线段）的最大距离，曲线位于控制点凸包内，因此这是曲线偏离弦的上界
+
+    投影落在弦外的控制点取到较近端点的距离，否则与弦共线但超出端点的控制点会被误判为平直
+    """
+    start = ctrl[:, :1]
+    chord = ctrl[:, -1:] - start
+    offset = ctrl - start
+    length2 = chord[..., 0] ** 2 + chord[..., 1] ** 2
+    dot = chord[..., 0] * offset[..., 0] + chord[..., 1] * offset[..., 1]
+    u = np.clip(dot / np.maximum(length2, 1e-12), 0.0, 1.0)[..., None]
+    nearest = offset - u * chord
+    return np.hypot(nearest[..., 0], nearest[..., 1]).max(axis=1)
+
+
+def bezier_polyline(p_list, tolerance=0.5, max_depth=16):
+    """自适应细分Bezier曲线，直到每一段都在tolerance像素内近似为直线
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表
+    :param tolerance: (float) 允许的弦高误差（像素）
+    :param max_depth: (int) 最大细分层数
+    :return: (np.ndarray of float, shape (M, 2)) 按参数顺序排列的折线顶点
+    """
+    ctrl = np.asarray(p_list, dtype=np.float64).reshape(1, -1, 2)
+    t0 = np.zeros(1)
+    done_ctrl = []
+    done_t0 = []
+    for depth in range(max_depth + 1):
+        flat = _flatness(ctrl) <= tolerance
+        if depth == max_depth:
+            flat[:] = True
+        done_ctrl.append(ctrl[flat])
+        done_t0.append(t0[flat])
+        ctrl = ctrl[~flat]
+        if len(ctrl) == 0:
+            break
+        left, right = _split_bezier(ctrl)
+        half = 0.5 ** (depth + 1)
+        ctrl = np.concatenate((left, right))
+        t0 = np.concatenate((t0[~flat], t0[~flat] + half))
+    pieces = np.concatenate(done_ctrl)[np.argsort(np.concatenate(done_t0), kind='stable')]
+    return np.concatenate((pieces[:, 0], pieces[-1:, -1]))
+
+
+def draw_polyline(points, algorithm='Bresenham'):
+    """用线段光栅化算法连接折线顶点，相邻线段共享的端点只输出一次
+
+    :param points: (array-like of int, shape (M, 2)) 折线顶点
+    :param algorithm: (string) 绘制使用的算法，包括'DDA'和'Bresenham'
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标
+    """
+    points = np.asarray(points, dtype=np.int64).reshape(-1, 2)
+    # 去掉取整后重合的相邻顶点
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:] = np.any(points[1:] != points[:-1], axis=1)
+    points = points[keep]
+    if len(points) < 2:
+        return points
+    pixels, offsets = draw_lines(np.stack((points[:-1], points[1:]), axis=1), algorithm)
+    # 除第一段外，每段的第一个像素就是上一段的最后一个像素
+    joint = np.zeros(len(pixels), dtype=bool)
+    joint[offsets[1:-1]] = True
+    return pixels[~joint]
+
+
+# 三次均匀B样条的基矩阵，P(s) = [s^3, s^2, s, 1] · M · [P_j, P_j+1, P_j+2, P_j+3]
+BSPLINE_BASIS = np.array([[-1, 3, -3, 1],
+                          [3, -6, 3, 0],
+                          [-3, 0, 3, 0],
+                          [1, 4, 1, 0]], dtype=np.float64) / 6
+
+
+@lru_cache(maxsize=None)
+def _bspline_weights(step):
+    """一个节点区间内各采样点的基函数取值，每个步长只计算一次，所有曲线共用
+
+    :param step: (float) 参数步长
+    :return: (np.ndarray of float, shape (K, 4)) 第k行是 s = k * step 处四个控制点的权重
+    """
+    s = np.arange(int(round(1 / step))) * step
+    weights = np.stack((s ** 3, s ** 2, s, np.ones_like(s)), axis=1) @ BSPLINE_BASIS
+    weights.setflags(write=False)
+    return weights
+
+
+def bspline_points(p_list, step=0.001):
+    """三次均匀B样条曲线上的采样点，每个节点区间是一次小的矩阵乘法
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表，至少4个
+    :param step: (float) 参数步长，与cg_algorithms.draw_curve中的u步长含义相同
+    :return: (np.ndarray of float, shape (T, 2)) 按参数顺序排列的曲线上的点，包括曲线终点
+    """
+    ctrl = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    if len(ctrl) < 4:
+        return np.empty((0, 2))
+    # 第j段由控制点 j..j+3 决定
+    windows = np.stack([ctrl[i:len(ctrl) - 3 + i] for i in range(4)], axis=1)
+    points = np.einsum('kc,jcd->jkd', _bspline_weights(step), windows).reshape(-1, 2)
+    end = BSPLINE_BASIS.sum(axis=0) @ windows[-1]
+    return np.concatenate((points, end[None]))
+
+
+def uniform_knots(n_ctrl, degree):
+    """均匀整数节点向量 0, 1, ..., n_ctrl + degree，与cg_algorithms.Basefunction使用的节点相同"""
+    return np.arange(n_ctrl + degree + 1, dtype=np.float64)
+
+
+def clamped_knots(n_ctrl, degree):
+    """准均匀（clamped）节点向量，首末节点重复degree+1次，曲线经过首末控制点，取值范围[0, 1]"""
+    inner = np.linspace(0, 1, n_ctrl - degree + 1)
+    return np.concatenate((np.zeros(degree), inner, np.ones(degree)))
+
+
+def de_boor(p_list, degree, knots, u):
+    """de Boor算法计算任意次数、任意节点向量的B样条曲线上的点，对所有参数同时迭代，不使用递归
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表
+    :param degree: (int) 曲线的次数p，控制点个数至少为p+1
+    :param knots: (array-like of float) 非递减的节点向量，长度为控制点个数 + p + 1
+    :param u: (array-like of float) 参数，取值范围[knots[p], knots[n+1]]
+    :return: (np.ndarray of float, shape (T, 2)) 曲线上的点
+    """
+    ctrl = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    knots = np.asarray(knots, dtype=np.float64)
+    n = len(ctrl) - 1
+    if degree < 1 or n < degree:
+        raise ValueError('B-spline of degree %d needs at least %d control points' % (degree, degree + 1))
+    if len(knots) != n + degree + 2:
+        raise ValueError('expected %d knots, got %d' % (n + degree + 2, len(knots)))
+    if np.any(np.diff(knots) < 0):
+        raise ValueError('knot vector must be non-decreasing')
+    u = np.asarray(u, dtype=np.float64).ravel()
+    # knots[k] <= u < knots[k + 1]，定义域右端点归入最后一个非空区间
+    k = np.clip(np.searchsorted(knots, u, side='right') - 1, degree, n)
+    d = ctrl[k[:, None] + np.arange(-degree, 1)]
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            left = knots[k + j - degree]
+            right = knots[k + j + 1 - r]
+            span = right - left
+            alpha = np.where(span > 0, (u - left) / np.where(span > 0, span, 1), 0.0)
+            d[:, j] = (1 - alpha)[:, None] * d[:, j - 1] + alpha[:, None] * d[:, j]
+    return d[:, degree]
+
+
+def draw_bspline(p_list, degree=3, knots=None, samples=None):
+    """绘制任意次数的B样条曲线
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表
+    :param degree: (int) 曲线的次数
+    :param knots: (array-like of float) 节点向量，默认为clamped_knots
+    :param samples: (int) 采样点个数，默认取控制多边形长度的两倍
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标
+    """
+    ctrl = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    if knots is None:
+        knots = clamped_knots(len(ctrl), degree)
+    knots = np.asarray(knots, dtype=np.float64)
+    if samples is None:
+        length = np.hypot(*np.diff(ctrl, axis=0).T).sum()
+        samples = max(2, int(math.ceil(2 * length)))
+    u = np.linspace(knots[degree], knots[len(ctrl)], samples)
+    return de_boor(ctrl, degree, knots, u).astype(np.int64)
+
+
+def draw_curve(p_list, algorithm):
+    """绘制曲线（向量化版本）
+
+    :param p_list: (list of list of int: [[x0, y0], [x1, y1], [x2, y2], ...]) 曲线的控制点坐标列表
+    :param algorithm: (string) 绘制使用的算法，包括'Bezier'、'Bezier-adaptive'和'B-spline'，
+        'Bezier-adaptive'按屏幕上的尺寸自适应细分，像素不重复也不间断
+    :return: (np.ndarray of int, shape (N, 2)) 绘制结果的像素点坐标
+    """
+    if len(p_list) == 0:
+        return _empty_pixels()
+    if algorithm == 'Bezier':
+        points = bezier_points(p_list, _parameter_range(0.0005, 1))
+        return points.astype(np.int64)
+    if algorithm == 'Bezier-adaptive':
+        pixels = draw_polyline(bezier_polyline(p_list).astype(np.int64))
+        # 自交的曲线会经过同一像素多次，只保留第一次
+        _, first = np.unique(pixels, axis=0, return_index=True)
+        return pixels[np.sort(first)]
+    if algorithm == 'B-spline' and len(p_list) >= 4:
+        return bspline_points(p_list).astype(np.int64)
+    return np.array(cg_algorithms.draw_curve(p_list, algorithm), dtype=np.int64).reshape(-1, 2)
+
+
+def translate_matrix(dx, dy):
+    """平移变换的齐次坐标矩阵，与cg_algorithms.translate含义相同"""
+    return np.array([[1, 0, dx],
+                     [0, 1, dy],
+                     [0, 0, 1]], dtype=np.float64)
+
+
+def rotate_matrix(x, y, r):
+    """绕 (x, y) 旋转r度的齐次坐标矩阵，与cg_algorithms.rotate含义相同"""
+    r = math.radians(360 + r)
+    c = math.cos(r)
+    s = math.sin(r)
+    return np.array([[c, -s, x - x * c + y * s],
+                     [s, c, y - x * s - y * c],
+                     [0, 0, 1]], dtype=np.float64)
+
+
+def scale_matrix(x, y, s):
+    """以 (x, y) 为中心缩放s倍的齐次坐标矩阵，与cg_algorithms.scale含义相同"""
+    return np.array([[s, 0, x - x * s],
+                     [0, s, y - y * s],
+                     [0, 0, 1]], dtype=np.float64)
+
+
+def _affine(x, y, matrix):
+    """逐元素计算 matrix · [x, y, 1]，matrix的形状为 (3, 3) 或与x、y对应的 (N, 3, 3)
+
+    单个图元和批量计算使用同样的运算顺序，保证结果逐位相同
+    """
+    m = matrix[..., :2, :]
+    return np.stack((m[..., 0, 0] * x + m[..., 0, 1] * y + m[..., 0, 2],
+                     m[..., 1, 0] * x + m[..., 1, 1] * y + m[..., 1, 2]), axis=-1)
+
+
+def apply_matrix(p_list, matrix):
+    """把齐次坐标变换矩阵作用到一组点上
+
+    :param p_list: (array-like, shape (N, 2)) 点的坐标
+    :param matrix: (np.ndarray of float, shape (3, 3)) 变换矩阵
+    :return: (np.ndarray of float, shape (N, 2)) 变换后的坐标，不取整
+    """
+    points = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    return _affine(points[:, 0], points[:, 1], np.asarray(matrix, dtype=np.float64))
+
+
+def transform_many(p_lists, matrices):
+    """对许多图元一次性做变换
+
+    :param p_lists: (list of array-like) 各图元的参数，每个形状为 (N_i, 2)
+    :param matrices: (np.ndarray of float) 所有图元共用的 (3, 3) 矩阵，或每个图元一个的 (K, 3, 3) 矩阵
+    :return: (list of np.ndarray of float) 各图元变换后的坐标，不取整
+    """
+    if len(p_lists) == 0:
+        return []
+    counts = np.array([len(p) for p in p_lists], dtype=np.int64)
+    points = np.concatenate([np.asarray(p, dtype=np.float64).reshape(-1, 2) for p in p_lists])
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if matrices.ndim == 3:
+        matrices = matrices[np.repeat(np.arange(len(p_lists)), counts)]
+    result = _affine(points[:, 0], points[:, 1], matrices)
+    return np.split(result, np.cumsum(counts)[:-1])
+
+
+def translate(p_list, dx, dy):
+    """平移变换（向量化版本）
+
+    :param p_list: (array-like of int, shape (N, 2)) 图元参数
+    :param dx: (int) 水平方向平移量
+    :param dy: (int) 垂直方向平移量
+    :return: (np.ndarray of int, shape (N, 2)) 变换后的图元参数
+    """
+    points = np.asarray(p_list).reshape(-1, 2)
+    return points + np.array([dx, dy], dtype=points.dtype)
+
+
+def rotate(p_list, x, y, r):
+    """旋转变换（向量化版本），三角函数只计算一次，结果与cg_algorithms.rotate相同
+
+    :param p_list: (array-like of int, shape (N, 2)) 图元参数
+    :param x: (int) 旋转中心x坐标
+    :param y: (int) 旋转中心y坐标
+    :param r: (int) 顺时针旋转角度（°）
+    :return: (np.ndarray of int, shape (N, 2)) 变换后的图元参数
+    """
+    points = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    r = math.radians(360 + r)
+    c = math.cos(r)
+    s = math.sin(r)
+    dx = points[:, 0] - x
+    dy = points[:, 1] - y
+    return np.rint(np.column_stack((x + dx * c - dy * s, y + dx * s + dy * c))).astype(np.int64)
+
+
+def scale(p_list, x, y, s):
+    """缩放变换（向量化版本），结果与cg_algorithms.scale相同
+
+    :param p_list: (array-like of int, shape (N, 2)) 图元参数
+    :param x: (int) 缩放中心x坐标
+    :param y: (int) 缩放中心y坐标
+    :param s: (float) 缩放倍数
+    :return: (np.ndarray of int, shape (N, 2)) 变换后的图元参数
+    """
+    points = np.asarray(p_list, dtype=np.float64).reshape(-1, 2)
+    return np.rint(np.column_stack((x + (points[:, 0] - x) * s, y + (points[:, 1] - y) * s))).astype(np.int64)
+
+
+LEFT = 0b0001
+RIGHT = 0b0010
+BOTTOM = 0b0100
+TOP = 0b1000
+
+
+def encode_many(x_min, y_min, x_max, y_max, x, y):
+    """批量计算Cohen-Sutherland区域编码，与cg_algorithms.encode相同"""
+    code = np.where(x < x_min, LEFT, np.where(x > x_max, RIGHT, 0))
+    code |= np.where(y > y_max, BOTTOM, np.where(y < y_min, TOP, 0))
+    return code
+
+
+def clip_many(segments, x_min, y_min, x_max, y_max, algorithm):
+    """批量线段裁剪
+
+    :param segments: (array-like of int, shape (N, 2, 2)) N条线段的起点和终点坐标
+    :param x_min: 裁剪窗口左上角x坐标
+    :param y_min: 裁剪窗口左上角y坐标
+    :param x_max: 裁剪窗口右下角x坐标
+    :param y_max: 裁剪窗口右下角y坐标
+    :param algorithm: (string) 使用的裁剪算法，包括'Cohen-Sutherland'和'Liang-Barsky'
+    :return: (clipped, keep) clipped为 (N, 2, 2) 的裁剪后线段，keep为 (N,) 的布尔数组，
+        keep为False的线段完全在窗口外（对应cg_algorithms.clip返回[]），其余各行与cg_algorithms.clip的结果相同
+    """
+    seg = np.asarray(segments, dtype=np.int64).reshape(-1, 2, 2)
+    x0 = seg[:, 0, 0]
+    y0 = seg[:, 0, 1]
+    x1 = seg[:, 1, 0]
+    y1 = seg[:, 1, 1]
+    clipped = seg.copy()
+    keep = np.ones(len(seg), dtype=bool)
+    if algorithm == 'Cohen-Sutherland':
+        code = np.stack((encode_many(x_min, y_min, x_max, y_max, x0, y0),
+                         encode_many(x_min, y_min, x_max, y_max, x1, y1)), axis=1)
+        dx = x1 - x0
+        dy = y1 - y0
+        safe_dx = np.where(dx == 0, 1, dx)
+        safe_dy = np.where(dy == 0, 1, dy)
+        active = (code[:, 0] | code[:, 1]) != 0
+        while np.any(active):
+            rejected = active & ((code[:, 0] & code[:, 1]) != 0)
+            keep[rejected] = False
+            active &= ~rejected
+            for i in range(2):
+                c = np.where(active, code[:, i], 0)
+                left = (c & LEFT) != 0
+                right = ~left & ((c & RIGHT) != 0)
+                bottom = ~left & ~right & ((c & BOTTOM) != 0)
+                top = ~left & ~right & ~bottom & ((c & TOP) != 0)
+                moved = left | right | bottom | top
+                if not np.any(moved):
+                    continue
+                edge_x = np.where(left, x_min, x_max)
+                edge_y = np.where(bottom, y_max, y_min)
+                # 与标量版本相同，总是用原始线段的端点计算交点
+                y_at_x = np.where(dx == 0, y0, y0 + dy * (edge_x - x0) / safe_dx)
+                x_at_y = x0 + dx * (edge_y - y0) / safe_dy
+                new_x = np.where(left | right, edge_x, x_at_y)
+                new_y = np.where(left | right, y_at_x, edge_y)
+                new_code = encode_many(x_min, y_min, x_max, y_max, new_x, new_y)
+                code[moved, i] = new_code[moved]
+                clipped[moved, i, 0] = np.trunc(new_x[moved]).astype(np.int64)
+                clipped[moved, i, 1] = np.trunc(new_y[moved]).astype(np.int64)
+                rejected = active & ((code[:, 0] & code[:, 1]) != 0)
+                keep[rejected] = False
+                active &= ~rejected
+            active &= (code[:, 0] | code[:, 1]) != 0
+    elif algorithm == 'Liang-Barsky':
+        dx = x1 - x0
+        dy = y1 - y0
+        u0, u1, keep = _liang_barsky(x0, y0, x1, y1, x_min, y_min, x_max, y_max)
+        clipped[:, 0, 0] = np.rint(x0 + u0 * dx)
+        clipped[:, 0, 1] = np.rint(y0 + u0 * dy)
+        clipped[:, 1, 0] = np.rint(x0 + u1 * dx)
+        clipped[:, 1, 1] = np.rint(y0 + u1 * dy)
+    return clipped, keep
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding:utf-8 -*-
+
+# cg_algorithms 与 cg_algorithms_np 中各图元算法的基准测试：
+# 按规模（线段长度、椭圆半径、控制点数、每次变换的点数、每次裁剪的线段数）扫描，
+# 记录每秒调用次数和吞吐量（像素/秒、点/秒、线段/秒），可保存为JSON基线并与之比较
+import sys
+import os
+import re
+import json
+import math
+import time
+import random
+import timeit
+import platform
+import argparse
+import numpy as np
+import cg_algorithms as alg
+import cg_algorithms_np as alg_np
+
+
+def _segment(rng, length):
+    """长度约为length、方向随机的线段"""
+    angle = rng.uniform(0, 2 * math.pi)
+    x0, y0 = rng.randint(0, 100), rng.randint(0, 100)
+    return [[x0, y0], [x0 + int(round(length * math.cos(angle))),
+                       y0 + int(round(length * math.sin(angle)))]]
+
+
+def _points(rng, count, extent=1000):
+    return [[rng.randint(0, extent), rng.randint(0, extent)] for _ in range(count)]
+
+
+def line_case(module, algorithm):
+    def setup(rng, length):
+        p_list = _segment(rng, length)
+        return lambda: module.draw_line(p_list, algorithm)
+    return setup
+
+
+def ellipse_case(module):
+    def setup(rng, radius):
+        p_list = [[0, 0], [2 * radius, radius]]
+        return lambda: module.draw_ellipse(p_list)
+    return setup
+
+
+def curve_case(module, algorithm):
+    def setup(rng, count):
+        p_list = _points(rng, count)
+        return lambda: module.draw_curve(p_list, algorithm)
+    return setup
+
+
+def transform_case(name):
+    """纯Python的变换逐点计算，向量化版本一次处理整个p_list"""
+    def setup(rng, count):
+        p_list = _points(rng, count)
+        args = {'translate': (10, -20), 'rotate': (500, 500, 30), 'scale': (500, 500, 1.5)}[name]
+        py_func = getattr(alg, name)
+        np_func = getattr(alg_np, name)
+        return (lambda: py_func(p_list, *args)), (lambda: np_func(p_list, *args))
+    return setup
+
+
+def clip_case(module, algorithm):
+    """每次调用裁剪count条线段：纯Python版本逐条调用clip，向量化版本调用一次clip_many
+
+    cg_algorithms.clip的Cohen-Sutherland会原地修改p_list，因此每次调用都传入新的副本，保证每轮裁剪的是同一批线段
+    """
+    def setup(rng, count):
+        segments = [_segment(rng, rng.randint(10, 400)) for _ in range(count)]
+        if module is alg:
+            return lambda: [alg.clip([list(p) for p in s], 20, 20, 180, 180, algorithm)
+                            for s in segments]
+        array = np.array(segments, dtype=np.int64)
+        return lambda: alg_np.clip_many(array, 20, 20, 180, 180, algorithm)
+    return setup
+
+
+def _pair(setup, index):
+    def pick(rng, size):
+        return setup(rng, size)[index]
+    return pick
+
+
+# (名字, 规模的含义, 吞吐量的单位, 规模列表, setup(rng, size) -> 被测函数)
+# 被测函数的返回值用来统计吞吐量：单位为'pixels'时取返回像素的个数，否则为规模本身
+BENCHMARKS = []
+for _algorithm in ('DDA', 'Bresenham'):
+    BENCHMARKS.append(('draw_line/%s/py' % _algorithm, 'length', 'pixels',
+                       [10, 100, 1000, 10000], line_case(alg, _algorithm)))
+    BENCHMARKS.append(('draw_line/%s/np' % _algorithm, 'length', 'pixels',
+                       [10, 100, 1000, 10000], line_case(alg_np, _algorithm)))
+BENCHMARKS.append(('draw_ellipse/py', 'radius', 'pixels', [10, 100, 1000], ellipse_case(alg)))
+BENCHMARKS.append(('draw_ellipse/np', 'radius', 'pixels', [10, 100, 1000], ellipse_case(alg_np)))
+for _algorithm in ('Bezier', 'B-spline'):
+    BENCHMARKS.append(('draw_curve/%s/py' % _algorithm, 'points', 'pixels',
+                       [4, 8, 16, 32], curve_case(alg, _algorithm)))
+    BENCHMARKS.append(('draw_curve/%s/np' % _algorithm, 'points', 'pixels',
+                       [4, 8, 16, 32], curve_case(alg_np, _algorithm)))
+BENCHMARKS.append(('draw_curve/Bezier-adaptive/np', 'points', 'pixels',
+                   [4, 8, 16, 32], curve_case(alg_np, 'Bezier-adaptive')))
+for _algorithm in ('Cohen-Sutherland', 'Liang-Barsky'):
+    BENCHMARKS.append(('clip/%s/py' % _algorithm, 'segments', 'segments',
+                       [1, 100, 10000], clip_case(alg, _algorithm)))
+    BENCHMARKS.append(('clip/%s/np' % _algorithm, 'segments', 'segments',
+                       [1, 100, 10000], clip_case(alg_np, _algorithm)))
+for _name in ('translate', 'rotate', 'scale'):
+    BENCHMARKS.append(('%s/py' % _name, 'points', 'points',
+                       [2, 100, 10000], _pair(transform_case(_name), 0)))
+    BENCHMARKS.append(('%s/np' % _name, 'points', 'points',
+                       [2, 100, 10000], _pair(transform_case(_name), 1)))
+
+
+def measure(func, min_time=0.2, repeat=3):
+    """
+    测量一个无参数函数每次调用的时间
+
+    :param func: 被测函数
+    :param min_time: (float) 每轮至少运行的秒数，调用次数由timeit自动确定
+    :param repeat: (int) 轮数，取最快的一轮以减少系统噪声
+    :return: (float) 每次调用的秒数
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9) * 1.1))
+    best = min([elapsed] + timer.repeat(repeat - 1, number))
+    return best / number
+
+
+def run(pattern=None, min_time=0.2, repeat=3, quick=False, seed=2020, out=sys.stdout):
+    """
+    运行基准测试
+
+    :param pattern: (str) 只运行名字匹配该正则表达式的测试
+    :param quick: (bool) 每个测试只取最小的两个规模
+    :return: (dict) 结果名 'name@size' -> {'size', 'seconds_per_call', 'calls_per_s', 'unit', 'units_per_s'}
+    """
+    results = {}
+    for name, size_label, unit, sizes, setup in BENCHMARKS:
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        for size in sizes[:2] if quick else sizes:
+            func = setup(random.Random(seed), size)
+            produced = func()
+            units = len(produced) if unit == 'pixels' else size
+            seconds = measure(func, min_time, repeat)
+            key = '%s@%d' % (name, size)
+            results[key] = {
+                'size': size,
+                'size_label': size_label,
+                'seconds_per_call': seconds,
+                'calls_per_s': 1 / seconds,
+                'unit': unit,
+                'units_per_s': units / seconds,
+            }
+            print('%-40s %s=%-6d %12.1f calls/s %14.0f %s/s' % (
+                name, size_label, size, 1 / seconds, units / seconds, unit), file=out)
+    return results
+
+
+def compare(results, baseline, threshold=0.1, out=sys.stdout):
+    """
+    与基线比较每秒调用次数
+
+    :param results: (dict) run的结果
+    :param baseline: (dict) 基线中的结果
+    :param threshold: (float) 比基线慢超过该比例时视为性能退化
+    :return: (list of str) 退化的结果名
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        ratio = result['calls_per_s'] / base['calls_per_s']
+        flag = ''
+        if ratio < 1 - threshold:
+            flag = 'REGRESSION'
+            regressions.append(key)
+        elif ratio > 1 + threshold:
+            flag = 'faster'
+        print('%-50s %7.2fx %s' % (key, ratio, flag), file=out)
+    return regressions
+
+
+def metadata():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='cg_algorithms 基准测试')
+    parser.add_argument('--filter', help='只运行名字匹配该正则表达式的测试，例如 draw_line 或 /np$')
+    parser.add_argument('--min-time', type=float, default=0.2, help='每轮至少运行的秒数')
+    parser.add_argument('--repeat', type=int, default=3, help='每个规模测量的轮数，取最快的一轮')
+    parser.add_argument('--quick', action='store_true', help='每个测试只取最小的两个规模')
+    parser.add_argument('--save', metavar='JSON', help='把结果保存为基线文件')
+    parser.add_argument('--compare', metavar='JSON', help='与基线文件比较，有退化时返回1')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='每秒调用次数比基线低超过该比例时视为退化')
+    args = parser.parse_args()
+
+    results = run(args.filter, args.min_time, args.repeat, args.quick)
+    if args.save:
+        directory = os.path.dirname(args.save)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.save, 'w') as fp:
+            json.dump({'meta': metadata(), 'results': results}, fp, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        print()
+        regressions = compare(results, baseline['results'], args.threshold)
+        if regressions:
+            print('%d regression(s) beyond %.0f%%: %s' % (
+                len(regressions), args.threshold * 100, ', '.join(regressions)), file=sys.stderr)
+            sys.exit(1)
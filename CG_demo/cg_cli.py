@@ -3,124 +3,1118 @@
 
 import sys
 import os
+import json
+import struct
+import zlib
+import itertools
+import argparse
+import time
+import threading
+import traceback
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 import cg_algorithms as alg
+import cg_algorithms_np as alg_np
 import numpy as np
 from PIL import Image
 
 
+class PixelCache:
+    """图元光栅化结果的缓存
+
+    每个图元ID保存一份像素结果，以 (item_type, p_list, algorithm, window) 作为校验键，
+    总字节数超过上限时按最近最少使用（LRU）的顺序淘汰
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024):
+        """
+
+        :param max_bytes: (int) 缓存像素数组的总字节数上限
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # item_id -> (key, pixels)
+
+    @staticmethod
+    def make_key(item_type, p_list, algorithm, window=None):
+        return item_type, tuple(tuple(p) for p in p_list), algorithm, window
+
+    def get(self, item_id, key):
+        entry = self._entries.get(item_id)
+        if entry is None or entry[0] != key:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(item_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, item_id, key, pixels):
+        self.invalidate(item_id)
+        if pixels.nbytes > self.max_bytes:
+            return
+        self._entries[item_id] = (key, pixels)
+        self.nbytes += pixels.nbytes
+        while self.nbytes > self.max_bytes:
+            _, (_, old) = self._entries.popitem(last=False)
+            self.nbytes -= old.nbytes
+
+    def invalidate(self, item_id):
+        entry = self._entries.pop(item_id, None)
+        if entry is not None:
+            self.nbytes -= entry[1].nbytes
+
+    def clear(self):
+        self._entries.clear()
+        self.nbytes = 0
+
+
+class Profiler:
+    """--profile的记录器
+
+    输出Chrome trace event格式的JSON，可以直接用chrome://tracing或Perfetto打开：
+    每条命令、每组图元的光栅化、每个图元的画布写入、每幅图像的编码各是一个完整事件（ph为'X'），
+    另在summary中按命令类型汇总次数、耗时、像素数，以及光栅化、画布写入和图像编码各自的耗时
+    """
+
+    FIELDS = ('count', 'wall_s', 'rasterize_s', 'write_s', 'encode_s', 'pixels')
+
+    def __init__(self):
+        self.events = []
+        self.summary = {}     # 命令类型 -> FIELDS中各项的累计值
+        self.command = None   # 正在执行的命令类型，光栅化、写入和编码的时间记在它名下
+        self._pid = os.getpid()
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, name, category, start, end, args=None):
+        """记录一个事件，start和end为time.perf_counter()的值"""
+        self.events.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': self._pid,
+            'tid': threading.get_native_id(),
+            'args': args or {},
+        })
+
+    def add(self, command, **amounts):
+        """累加某个命令类型的汇总值，可能在写入线程中调用"""
+        with self._lock:
+            totals = self.summary.setdefault(command, dict.fromkeys(self.FIELDS, 0))
+            for field, amount in amounts.items():
+                totals[field] += amount
+
+    def item(self, item_id, item, pixels, rasterize, start, end):
+        """记录一个图元：像素数、光栅化的秒数（批量绘制时按像素数分摊），以及写入画布的时间段"""
+        self.record(item_id, 'item', start, end, {
+            'type': item[0],
+            'algorithm': item[2],
+            'pixels': pixels,
+            'rasterize_us': rasterize * 1e6,
+            'write_us': (end - start) * 1e6,
+        })
+        self.add(self.command, write_s=end - start, pixels=pixels)
+
+    def save(self, path):
+        with open(path, 'w') as fp:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                       'summary': self.summary}, fp)
+
+
+def item_points(item):
+    """图元当前的参数：把累积的变换矩阵一次性作用到p_list上，只在这里取整
+
+    :param item: (list) [item_type, p_list, algorithm, color, matrix]，matrix为None表示没有待应用的变换
+    :return: (list of list of int) 变换后的图元参数
+    """
+    p_list, matrix = item[1], item[4]
+    if matrix is None or len(p_list) == 0:
+        return p_list
+    return np.rint(alg_np.apply_matrix(p_list, matrix)).astype(np.int64).tolist()
+
+
+def transform_item(item, matrix):
+    """在图元已有的变换之后追加一个变换，不修改p_list"""
+    item[4] = matrix if item[4] is None else matrix @ item[4]
+
+
+def apply_item_transform(item):
+    """把图元累积的变换写回p_list，之后的操作（如裁剪）需要真实的坐标"""
+    item[1] = item_points(item)
+    item[4] = None
+
+
+def item_visible(item_type, p_list, window):
+    """包围盒与窗口是否相交
+
+    曲线位于控制点的凸包内，椭圆位于两个角点构成的矩形内，因此都用控制点的包围盒判断，
+    并留出一个像素的余量以包含取整带来的偏差
+    """
+    if len(p_list) == 0:
+        return False
+    xs = [p[0] for p in p_list]
+    ys = [p[1] for p in p_list]
+    x_min, y_min, x_max, y_max = window
+    return (min(xs) <= x_max + 1 and max(xs) >= x_min - 1 and
+            min(ys) <= y_max + 1 and max(ys) >= y_min - 1)
+
+
+def resolve_points(items):
+    """所有带有待应用变换的图元在一次 transform_many 调用中完成变换
+
+    :param items: (list) [item_type, p_list, algorithm, color, matrix] 的列表
+    :return: (list of list) 各图元变换后的参数
+    """
+    p_lists = [item[1] for item in items]
+    pending = [index for index, item in enumerate(items)
+               if item[4] is not None and len(item[1]) > 0]
+    if pending:
+        transformed = alg_np.transform_many(
+            [items[index][1] for index in pending],
+            np.stack([items[index][4] for index in pending]))
+        for index, points in zip(pending, transformed):
+            p_lists[index] = np.rint(points).astype(np.int64).tolist()
+    return p_lists
+
+
+def draw_items(item_dict, cache=None, window=None, timings=None):
+    """对所有图元进行光栅化
+
+    线段和多边形的各条边按算法分组，每组只调用一次 alg_np.draw_lines
+
+    :param item_dict: (dict) 图元ID到 [item_type, p_list, algorithm, color, matrix] 的映射
+    :param cache: (PixelCache) 可选，命中缓存的图元不再重新光栅化
+    :param window: (tuple of int: (x_min, y_min, x_max, y_max)) 可选的可见区域，包围盒在区域外的图元被跳过，
+        线段、多边形的边和填充只计算区域内的部分；区域内的像素与不加区域时相同
+    :param timings: (list of float) 可选，与item_dict等长，写入各图元光栅化的秒数，命中缓存的图元为0
+    :return: (list of (pixels, color)) 按图元在item_dict中的顺序排列的像素坐标和颜色
+    """
+    item_ids = list(item_dict.keys())
+    items = list(item_dict.values())
+    result = [None] * len(items)
+    # 未命中缓存、需要写回缓存的图元: (下标, 校验键)
+    missed = []
+    # algorithm -> [(图元下标, 边数)], [边]
+    batches = {}
+    p_lists = resolve_points(items)
+    for index, item in enumerate(items):
+        item_type, _, algorithm, color, _ = item
+        p_list = p_lists[index]
+        if cache is not None:
+            key = cache.make_key(item_type, p_list, algorithm, window)
+            pixels = cache.get(item_ids[index], key)
+            if pixels is not None:
+                result[index] = (pixels, color)
+                continue
+            missed.append((index, key))
+        if window is not None and not item_visible(item_type, p_list, window):
+            result[index] = ([], color)
+            continue
+        if timings is not None:
+            started = time.perf_counter()
+        edges = None
+        pixels = []
+        if item_type == 'line':
+            if len(p_list) == 2:
+                edges = [p_list]
+        elif item_type == 'polygon':
+            if algorithm == 'Scanline':
+                pixels = alg_np.fill_polygon(p_list, window)
+            else:
+                edges = alg_np.polygon_edges(p_list).tolist()
+        elif item_type == 'ellipse':
+            pixels = alg_np.draw_ellipse(p_list)
+        elif item_type == 'curve':
+            pixels = alg_np.draw_curve(p_list, algorithm)
+        if timings is not None:
+            timings[index] = time.perf_counter() - started
+        if edges is None:
+            result[index] = (pixels, color)
+            continue
+        owners, segments = batches.setdefault(algorithm, ([], []))
+        owners.append((index, len(edges)))
+        segments.extend(edges)
+    for algorithm, (owners, segments) in batches.items():
+        if timings is not None:
+            started = time.perf_counter()
+        pixels, offsets = alg_np.draw_lines(
+            np.array(segments, dtype=np.int64).reshape(-1, 2, 2), algorithm, window)
+        if timings is not None:
+            # 一批线段共用一次调用，按各图元的像素数分摊这次调用的时间
+            per_pixel = (time.perf_counter() - started) / max(len(pixels), 1)
+        first = 0
+        for index, count in owners:
+            result[index] = (
+                pixels[offsets[first]:offsets[first + count]], items[index][3])
+            if timings is not None:
+                timings[index] += per_pixel * (offsets[first + count] - offsets[first])
+            first += count
+    for index, key in missed:
+        pixels, color = result[index]
+        pixels = np.array(pixels, dtype=np.int64).reshape(-1, 2)
+        result[index] = (pixels, color)
+        cache.put(item_ids[index], key, pixels)
+    return result
+
+
+def paint_pixels(canvas, pixels, color):
+    """把一个图元的所有像素一次性写入画布
+
+    超出画布范围的像素被丢弃，而不是像负数下标那样绕到画布另一侧
+
+    :param canvas: (np.ndarray of uint8, shape (height, width, 3)) 画布
+    :param pixels: (array-like of int, shape (N, 2)) 像素坐标
+    :param color: (np.ndarray of uint8, shape (3,)) 颜色
+    """
+    pixels = np.asarray(pixels, dtype=np.int64).reshape(-1, 2)
+    x = pixels[:, 0]
+    y = pixels[:, 1]
+    height, width = canvas.shape[:2]
+    inside = (x >= 0) & (x < width) & (y >= 0) & (y < height)
+    canvas[y[inside], x[inside]] = color
+
+
+def render_canvas(item_dict, width, height, cache=None, canvas=None, chunk_size=4096, profiler=None):
+    """按图元顺序绘制整幅画布，后绘制的图元覆盖先绘制的图元
+
+    图元每chunk_size个一组光栅化并写入画布，同时存在的像素结果只有一组
+
+    :param cache: (PixelCache) 可选的图元像素缓存
+    :param canvas: (np.ndarray of uint8, shape (height, width, 3)) 可选的已填充背景色的画布，
+        例如MappedCanvas.array；为None时在内存中新建
+    :param chunk_size: (int) 每组的图元数
+    :param profiler: (Profiler) 可选，记录每组的光栅化时间和每个图元的像素数、写入时间
+    :return: (np.ndarray of uint8, shape (height, width, 3)) 画布
+    """
+    if canvas is None:
+        canvas = np.zeros([height, width, 3], np.uint8)
+        canvas.fill(255)
+    window = (0, 0, width - 1, height - 1)
+    items = iter(item_dict.items())
+    while True:
+        chunk = dict(itertools.islice(items, chunk_size))
+        if not chunk:
+            break
+        if profiler is None:
+            for pixels, color in draw_items(chunk, cache, window):
+                paint_pixels(canvas, pixels, color)
+            continue
+        timings = [0.0] * len(chunk)
+        started = time.perf_counter()
+        drawn = draw_items(chunk, cache, window, timings)
+        ended = time.perf_counter()
+        profiler.record('rasterize', 'phase', started, ended, {'items': len(chunk)})
+        profiler.add(profiler.command, rasterize_s=ended - started)
+        for (item_id, item), (pixels, color), rasterize in zip(chunk.items(), drawn, timings):
+            started = time.perf_counter()
+            paint_pixels(canvas, pixels, color)
+            profiler.item(item_id, item, len(pixels), rasterize, started, time.perf_counter())
+    return canvas
+
+
+class SharedCanvas:
+    """共享内存中的画布，工作进程按名字连接后直接写入自己负责的分块
+
+    close之前必须释放所有指向array的引用
+    """
+
+    def __init__(self, width, height, name=None):
+        """
+
+        :param width: (int) 画布宽度
+        :param height: (int) 画布高度
+        :param name: (str) 已有共享内存的名字，为None时新建一块并填充为白色
+        """
+        self._owner = name is None
+        self._shm = shared_memory.SharedMemory(
+            name=name, create=self._owner, size=max(1, width * height * 3) if self._owner else 0)
+        self.name = self._shm.name
+        self.array = np.ndarray((height, width, 3), np.uint8, buffer=self._shm.buf)
+        if self._owner:
+            self.array.fill(255)
+
+    def attach_args(self):
+        """工作进程中重新连接这块画布所需的构造参数"""
+        return self.array.shape[1], self.array.shape[0], self.name
+
+    def close(self):
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def bmp_header(width, height):
+    """24位BMP的文件头和信息头，与PIL保存的BMP相同
+
+    :return: (bytes) 54字节的文件头
+    """
+    stride = (width * 3 + 3) & ~3
+    ppm = int(96 * 39.3701 + 0.5)
+    offset = 14 + 40
+    return struct.pack('<2sIII', b'BM', offset + stride * height, 0, offset) + struct.pack(
+        '<IiiHHIIiiII', 40, width, height, 1, 24, 0, stride * height, ppm, ppm, 0, 0)
+
+
+def _png_chunk(fp, kind, data):
+    fp.write(struct.pack('>I', len(data)) + kind + data +
+             struct.pack('>I', zlib.crc32(data, zlib.crc32(kind)) & 0xffffffff))
+
+
+def save_png_strips(canvas, path, compress_level=6, strip_bytes=4 * 1024 * 1024):
+    """
+    按行条带把画布编码为png，内存中同时只有一个条带，适合MappedCanvas这样不在内存中的画布
+
+    每行使用Up滤波（与上一行逐字节相减），条带之间保留上一条带的最后一行
+
+    :param canvas: (np.ndarray of uint8, shape (height, width, 3)) 画布，可以是任意步长的视图
+    :param path: (str) 输出文件路径
+    :param compress_level: (int) zlib压缩级别0~9
+    :param strip_bytes: (int) 每个条带的大约字节数
+    """
+    height, width = canvas.shape[:2]
+    rows_per_strip = max(1, strip_bytes // max(1, width * 3))
+    compressor = zlib.compressobj(compress_level)
+    previous = np.zeros((1, width * 3), np.uint8)
+    with open(path, 'wb') as fp:
+        fp.write(b'\x89PNG\r\n\x1a\n')
+        _png_chunk(fp, b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+        for y in range(0, height, rows_per_strip):
+            rows = np.ascontiguousarray(canvas[y:y + rows_per_strip]).reshape(-1, width * 3)
+            filtered = np.empty((len(rows), width * 3 + 1), np.uint8)
+            filtered[:, 0] = 2
+            filtered[:, 1:] = rows - np.concatenate((previous, rows[:-1]))
+            previous = rows[-1:]
+            data = compressor.compress(filtered.tobytes())
+            if data:
+                _png_chunk(fp, b'IDAT', data)
+        _png_chunk(fp, b'IDAT', compressor.flush())
+        _png_chunk(fp, b'IEND', b'')
+
+
+class MappedCanvas:
+    """
+    映射到磁盘文件的画布，画布大小只受磁盘空间限制
+
+    文件布局与24位BMP完全相同：54字节的头之后是自下而上、每行补齐到4字节的BGR像素。
+    array是这块映射上的 (height, width, 3) RGB视图（行和通道的步长为负），
+    因此光栅化直接写入文件，保存为bmp时只需flush后把文件改名，不再复制像素
+    """
+
+    HEADER_SIZE = 54
+
+    def __init__(self, width, height, path, create=True):
+        """
+
+        :param width: (int) 画布宽度
+        :param height: (int) 画布高度
+        :param path: (str) 画布文件路径
+        :param create: (bool) 为True时新建文件并填充为白色，否则连接已有的文件
+        """
+        self.path = path
+        self._owner = create
+        stride = (width * 3 + 3) & ~3
+        if create:
+            with open(path, 'wb') as fp:
+                fp.write(bmp_header(width, height))
+                fp.truncate(self.HEADER_SIZE + stride * height)
+        if width * height == 0:
+            self._map = None
+            self.array = np.zeros((height, width, 3), np.uint8)
+            return
+        self._map = np.memmap(path, np.uint8, 'r+', offset=self.HEADER_SIZE, shape=(height, stride))
+        self.array = self._map[::-1, :width * 3].reshape(height, width, 3)[:, :, ::-1]
+        if create:
+            self.array.fill(255)
+
+    def attach_args(self):
+        return self.array.shape[1], self.array.shape[0], self.path, False
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+
+    def _release(self):
+        self.flush()
+        self.array = None
+        self._map = None
+
+    def commit(self, path):
+        """写完的画布本身就是bmp文件，改名为输出文件"""
+        self._release()
+        os.replace(self.path, path)
+
+    def close(self):
+        self._release()
+        if self._owner and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def bin_items(item_dict, width, height, tile_size):
+    """按包围盒把图元分配到与之相交的分块中
+
+    :param item_dict: (dict) 图元ID到 [item_type, p_list, algorithm, color, matrix] 的映射
+    :param width: (int) 画布宽度
+    :param height: (int) 画布高度
+    :param tile_size: (int) 分块边长
+    :return: (list of ((int, int, int, int), dict)) 非空分块的 (x_min, y_min, x_max, y_max)
+        和其中的图元，图元保持在item_dict中的顺序，待应用的变换已经写回p_list
+    """
+    tiles = {}
+    items = list(item_dict.items())
+    p_lists = resolve_points([item for _, item in items])
+    columns = (width + tile_size - 1) // tile_size
+    rows = (height + tile_size - 1) // tile_size
+    for (item_id, item), p_list in zip(items, p_lists):
+        if len(p_list) == 0:
+            continue
+        points = np.asarray(p_list)
+        # 与item_visible相同，留出一个像素的余量
+        x_min, y_min = points.min(axis=0) - 1
+        x_max, y_max = points.max(axis=0) + 1
+        if x_max < 0 or y_max < 0 or x_min >= width or y_min >= height:
+            continue
+        binned = [item[0], p_list, item[2], item[3], None]
+        for cx in range(max(0, x_min // tile_size), min(columns - 1, x_max // tile_size) + 1):
+            for cy in range(max(0, y_min // tile_size), min(rows - 1, y_max // tile_size) + 1):
+                tiles.setdefault((cx, cy), {})[item_id] = binned
+    return [((cx * tile_size, cy * tile_size,
+              min(width, (cx + 1) * tile_size) - 1, min(height, (cy + 1) * tile_size) - 1), tile_items)
+            for (cx, cy), tile_items in tiles.items()]
+
+
+def paint_tile(canvas, tile, item_dict):
+    """只在画布的一个分块内按顺序绘制图元，分块外的像素不写入"""
+    x_min, y_min, x_max, y_max = tile
+    view = canvas[y_min:y_max + 1, x_min:x_max + 1]
+    for pixels, color in draw_items(item_dict, None, tile):
+        pixels = np.asarray(pixels, dtype=np.int64).reshape(-1, 2)
+        paint_pixels(view, pixels - [x_min, y_min], color)
+
+
+def render_tile(canvas_type, canvas_args, tile, item_dict):
+    """工作进程：连接共享内存或磁盘映射的画布并绘制一个分块"""
+    with canvas_type(*canvas_args) as canvas:
+        paint_tile(canvas.array, tile, item_dict)
+
+
+def render_tiles(item_dict, canvas, width, height, executor, tile_size=1024):
+    """把画布切成分块，在进程池中并行光栅化，结果与render_canvas逐像素相同
+
+    每个分块只由一个进程写入，块内仍按图元顺序绘制，因此后绘制的图元覆盖先绘制的图元
+
+    :param canvas: (SharedCanvas or MappedCanvas) 已填充背景色的画布
+    :param executor: (ProcessPoolExecutor) 进程池
+    """
+    futures = [executor.submit(render_tile, type(canvas), canvas.attach_args(), tile, tile_items)
+               for tile, tile_items in bin_items(item_dict, width, height, tile_size)]
+    for future in futures:
+        future.result()
+
+
+class ImageWriter:
+    """saveCanvas的输出阶段：在后台线程中编码并写入图像，命令循环不必等待
+
+    同时在途的图像数有上限，超过上限时write阻塞，避免渲染比写盘快时画布在内存中堆积
+    """
+
+    FORMATS = ('bmp', 'png')
+
+    def __init__(self, image_format='bmp', compress_level=6, threads=2, max_pending=None):
+        """
+
+        :param image_format: (str) 'bmp'或'png'
+        :param compress_level: (int) png的压缩级别0~9，对bmp无效
+        :param threads: (int) 写入线程数，0表示在调用线程中同步写入
+        :param max_pending: (int) 同时在途（排队或正在写入）的图像数上限，默认为线程数的2倍
+        """
+        if image_format not in self.FORMATS:
+            raise ValueError('unsupported image format %r' % image_format)
+        self.image_format = image_format
+        self.params = {'compress_level': compress_level} if image_format == 'png' else {}
+        self._executor = ThreadPoolExecutor(threads) if threads > 0 else None
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * max(threads, 1))
+        self._futures = []
+        self._temp_count = 0
+        self.profiler = None  # 可选的Profiler，记录每幅图像的编码时间
+
+    @property
+    def extension(self):
+        return '.' + self.image_format
+
+    def _encode(self, canvas, path):
+        Image.fromarray(canvas).save(path, self.image_format, **self.params)
+
+    def _save(self, canvas, path, command=None, lineno=None, temp=None, previous=None):
+        """
+        编码并写入一幅图像
+
+        :param lineno: (int) saveCanvas命令的行号，不为None时写入错误转换为CommandError
+        :param temp: (str) 不为None时先写入该临时文件，最后改名为path
+        :param previous: (Future) 前一幅图像的写入任务，等它成功后才改名；它失败时丢弃临时文件并抛出它的错误，
+            因此某幅图像写入失败时，之后的图像都不会出现，输出文件与同步写入时相同
+        """
+        if self.profiler is not None:
+            started = time.perf_counter()
+        owned = isinstance(canvas, (SharedCanvas, MappedCanvas))
+        target = temp if temp is not None else path
+        try:
+            try:
+                if isinstance(canvas, MappedCanvas) and self.image_format == 'bmp':
+                    canvas.commit(target)
+                elif isinstance(canvas, MappedCanvas) and canvas.array.size > 0:
+                    # PIL会先把整幅画布复制到内存，这里从映射中逐条带编码
+                    save_png_strips(canvas.array, target, self.params['compress_level'])
+                elif owned:
+                    self._encode(canvas.array, target)
+                else:
+                    self._encode(canvas, target)
+            finally:
+                # 写入失败时也要释放共享内存、删除磁盘映射的画布文件；改名成功后close不会删除输出文件
+                if owned:
+                    canvas.close()
+                self._slots.release()
+            if self.profiler is not None:
+                ended = time.perf_counter()
+                self.profiler.record('encode', 'phase', started, ended,
+                                     {'path': path, 'format': self.image_format})
+                self.profiler.add(command, encode_s=ended - started)
+            if previous is not None:
+                previous.result()
+            if temp is not None:
+                os.replace(temp, path)
+        except BaseException as e:
+            if temp is not None and os.path.exists(temp):
+                os.remove(temp)
+            # 异常的帧中还有指向画布数组的引用，不释放的话共享内存无法关闭
+            traceback.clear_frames(e.__traceback__)
+            if lineno is not None and isinstance(e, Exception) and not isinstance(e, CommandError):
+                raise CommandError(lineno, '%s: %s' % (type(e).__name__, e)) from e
+            raise
+
+    def write(self, canvas, path, lineno=None):
+        """
+        写入一幅画布，写入线程接管画布，调用者之后不应再修改它
+
+        :param canvas: (np.ndarray, SharedCanvas or MappedCanvas) 画布，后两者在写入后被关闭
+        :param path: (str) 输出文件路径
+        :param lineno: (int) 可选，saveCanvas命令的行号，写入失败时抛出带有该行号的CommandError
+        """
+        if any(future.done() and future.exception() is not None for future in self._futures):
+            # 之前的图像写入失败：不再接受新的图像，等在途的图像写完后抛出最早的写入错误
+            if isinstance(canvas, (SharedCanvas, MappedCanvas)):
+                canvas.close()
+            self.flush()
+        self._slots.acquire()
+        command = self.profiler.command if self.profiler is not None else None
+        if self._executor is None:
+            self._save(canvas, path, command, lineno)
+            return
+        # 各线程并行编码，但按提交的顺序改名为最终文件名
+        self._temp_count += 1
+        temp = os.path.join(os.path.dirname(path), '.%s.%d.%d.tmp' % (
+            os.path.basename(path), os.getpid(), self._temp_count))
+        previous = self._futures[-1] if self._futures else None
+        self._futures = [future for future in self._futures if not future.done() or future.exception()]
+        self._futures.append(self._executor.submit(
+            self._save, canvas, path, command, lineno, temp, previous))
+
+    def flush(self):
+        """等待所有已提交的图像写完，重新抛出第一个写入错误"""
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+
+class CommandError(Exception):
+    """输入文件中格式错误或无法执行的命令，带有出错的行号"""
+
+    def __init__(self, lineno, message):
+        super().__init__('line %d: %s' % (lineno, message))
+        self.lineno = lineno
+        self.message = message
+
+
+# 解析后的命令记录，lineno为命令在输入文件中的行号（从1开始）
+ResetCanvas = namedtuple('ResetCanvas', 'lineno width height')
+SaveCanvas = namedtuple('SaveCanvas', 'lineno name')
+SetColor = namedtuple('SetColor', 'lineno r g b')
+DrawItem = namedtuple('DrawItem', 'lineno item_id item_type p_list algorithm')
+Translate = namedtuple('Translate', 'lineno item_id dx dy')
+Rotate = namedtuple('Rotate', 'lineno item_id x y r')
+Scale = namedtuple('Scale', 'lineno item_id x y s')
+Clip = namedtuple('Clip', 'lineno item_id x_min y_min x_max y_max algorithm')
+
+
+def _points(values):
+    return [[int(values[i]), int(values[i + 1])] for i in range(0, len(values), 2)]
+
+
+def _parse_point_list(item_type):
+    def parse(lineno, args):
+        if len(args) < 4 or len(args) % 2 != 0:
+            raise ValueError('expected: item_id x0 y0 [x1 y1 ...] algorithm')
+        return DrawItem(lineno, args[0], item_type, _points(args[1:-1]), args[-1])
+    return parse
+
+
+def _parse_fixed(count, usage, build):
+    def parse(lineno, args):
+        if len(args) != count:
+            raise ValueError('expected %d arguments: %s' % (count, usage))
+        return build(lineno, *args)
+    return parse
+
+
+def _color(lineno, r, g, b):
+    rgb = int(r), int(g), int(b)
+    if not all(0 <= c <= 255 for c in rgb):
+        raise ValueError('R G B must be in 0..255')
+    return SetColor(lineno, *rgb)
+
+
+# 命令名 -> 解析函数 parse(lineno, args)，解析失败时抛出ValueError
+PARSERS = {
+    'resetCanvas': _parse_fixed(
+        2, 'width height',
+        lambda lineno, w, h: ResetCanvas(lineno, int(w), int(h))),
+    'saveCanvas': _parse_fixed(
+        1, 'name',
+        lambda lineno, name: SaveCanvas(lineno, name)),
+    'setColor': _parse_fixed(3, 'R G B', _color),
+    'drawLine': _parse_fixed(
+        6, 'item_id x0 y0 x1 y1 algorithm',
+        lambda lineno, item_id, x0, y0, x1, y1, algorithm: DrawItem(
+            lineno, item_id, 'line', _points([x0, y0, x1, y1]), algorithm)),
+    'drawPolygon': _parse_point_list('polygon'),
+    'drawEllipse': _parse_fixed(
+        5, 'item_id x0 y0 x1 y1',
+        lambda lineno, item_id, x0, y0, x1, y1: DrawItem(
+            lineno, item_id, 'ellipse', _points([x0, y0, x1, y1]), 'middlecircle')),
+    'drawCurve': _parse_point_list('curve'),
+    'translate': _parse_fixed(
+        3, 'item_id dx dy',
+        lambda lineno, item_id, dx, dy: Translate(lineno, item_id, int(dx), int(dy))),
+    'rotate': _parse_fixed(
+        4, 'item_id x y r',
+        lambda lineno, item_id, x, y, r: Rotate(lineno, item_id, int(x), int(y), int(r))),
+    'scale': _parse_fixed(
+        4, 'item_id x y s',
+        lambda lineno, item_id, x, y, s: Scale(lineno, item_id, int(x), int(y), float(s))),
+    'clip': _parse_fixed(
+        6, 'item_id x_min y_min x_max y_max algorithm',
+        lambda lineno, item_id, x_min, y_min, x_max, y_max, algorithm: Clip(
+            lineno, item_id, int(x_min), int(y_min), int(x_max), int(y_max), algorithm)),
+}
+
+
+def parse_commands(lines, start=1):
+    """逐行解析命令，每次只读入一行，内存占用与输入文件大小无关
+
+    :param lines: (iterable of str) 输入的各行，例如打开的文件对象
+    :param start: (int) 第一行的行号
+    :return: (generator) 命令记录，空行被跳过
+    """
+    for lineno, line in enumerate(lines, start):
+        tokens = line.split()
+        if not tokens:
+            continue
+        parse = PARSERS.get(tokens[0])
+        if parse is None:
+            raise CommandError(lineno, 'unknown command %r' % tokens[0])
+        try:
+            yield parse(lineno, tokens[1:])
+        except ValueError as e:
+            raise CommandError(lineno, '%s: %s' % (tokens[0], e)) from None
+
+
+class CanvasState:
+    """命令执行时的画布状态"""
+
+    def __init__(self, output_dir, cache=None, tile_executor=None, tile_size=1024, writer=None,
+                 memmap=False, profiler=None):
+        """
+
+        :param output_dir: (str) saveCanvas的输出目录
+        :param cache: (PixelCache) 可选的图元像素缓存
+        :param tile_executor: (ProcessPoolExecutor) 可选，saveCanvas在其中分块并行光栅化
+        :param tile_size: (int) 分块边长
+        :param writer: (ImageWriter) 图像输出阶段，默认同步写入bmp
+        :param memmap: (bool) 为True时saveCanvas在output_dir下的磁盘映射画布（MappedCanvas）中绘制
+        :param profiler: (Profiler) 可选的性能记录器，为None时不做任何记录
+        """
+        self.output_dir = output_dir
+        self.cache = cache
+        self.tile_executor = tile_executor
+        self.tile_size = tile_size
+        self.writer = writer if writer is not None else ImageWriter(threads=0)
+        self.memmap = memmap
+        self.profiler = profiler
+        self.writer.profiler = profiler
+        self._canvas_count = 0
+        self.item_dict = {}
+        self.pen_color = np.zeros(3, np.uint8)
+        self.width = 0
+        self.height = 0
+
+    def output_path(self, name):
+        """saveCanvas写入的文件路径"""
+        return os.path.join(self.output_dir, name + self.writer.extension)
+
+    def canvas_path(self):
+        """新建磁盘映射画布的路径，与输出文件在同一目录，保证改名不跨文件系统"""
+        self._canvas_count += 1
+        return os.path.join(self.output_dir, '.canvas.%d.%d.tmp' % (os.getpid(), self._canvas_count))
+
+    def item(self, cmd):
+        """命令引用的图元；编辑图元之前使其缓存失效"""
+        item = self.item_dict.get(cmd.item_id)
+        if item is None:
+            raise CommandError(cmd.lineno, 'unknown item id %r' % cmd.item_id)
+        if self.cache is not None:
+            self.cache.invalidate(cmd.item_id)
+        return item
+
+
+def reset_canvas(state, cmd):
+    state.width = cmd.width
+    state.height = cmd.height
+    state.item_dict = {}
+    if state.cache is not None:
+        state.cache.clear()
+
+
+def save_canvas(state, cmd):
+    if state.memmap:
+        canvas = MappedCanvas(state.width, state.height, state.canvas_path())
+    elif state.tile_executor is not None:
+        canvas = SharedCanvas(state.width, state.height)
+    else:
+        canvas = render_canvas(state.item_dict, state.width, state.height, state.cache,
+                               profiler=state.profiler)
+        state.writer.write(canvas, state.output_path(cmd.name), cmd.lineno)
+        return
+    try:
+        if state.tile_executor is not None:
+            if state.profiler is not None:
+                started = time.perf_counter()
+            render_tiles(state.item_dict, canvas, state.width, state.height,
+                         state.tile_executor, state.tile_size)
+            if state.profiler is not None:
+                # 分块在工作进程中光栅化并写入，这里只能记录两者的总时间
+                ended = time.perf_counter()
+                state.profiler.record('rasterize', 'phase', started, ended, {'tiles': True})
+                state.profiler.add(state.profiler.command, rasterize_s=ended - started)
+        else:
+            render_canvas(state.item_dict, state.width, state.height, state.cache, canvas.array,
+                          profiler=state.profiler)
+    except BaseException:
+        canvas.close()
+        raise
+    state.writer.write(canvas, state.output_path(cmd.name), cmd.lineno)
+
+
+def set_color(state, cmd):
+    state.pen_color[:] = (cmd.r, cmd.g, cmd.b)
+
+
+def draw_item(state, cmd):
+    state.item_dict[cmd.item_id] = [
+        cmd.item_type, cmd.p_list, cmd.algorithm, np.array(state.pen_color), None]
+
+
+def translate(state, cmd):
+    transform_item(state.item(cmd), alg_np.translate_matrix(cmd.dx, cmd.dy))
+
+
+def rotate(state, cmd):
+    transform_item(state.item(cmd), alg_np.rotate_matrix(cmd.x, cmd.y, cmd.r))
+
+
+def scale(state, cmd):
+    transform_item(state.item(cmd), alg_np.scale_matrix(cmd.x, cmd.y, cmd.s))
+
+
+def clip(state, cmd):
+    item = state.item(cmd)
+    apply_item_transform(item)
+    item[1] = alg.clip(item[1], cmd.x_min, cmd.y_min, cmd.x_max, cmd.y_max, cmd.algorithm)
+
+
+# 命令记录类型 -> 处理函数 handler(state, cmd)
+HANDLERS = {
+    ResetCanvas: reset_canvas,
+    SaveCanvas: save_canvas,
+    SetColor: set_color,
+    DrawItem: draw_item,
+    Translate: translate,
+    Rotate: rotate,
+    Scale: scale,
+    Clip: clip,
+}
+
+
+def run_commands(commands, state):
+    """依次执行命令
+
+    :param commands: (iterable) 命令记录
+    :param state: (CanvasState) 画布状态
+    :return: (int) 执行的命令数
+    """
+    count = 0
+    profiler = state.profiler
+    for cmd in commands:
+        if profiler is None:
+            HANDLERS[type(cmd)](state, cmd)
+        else:
+            name = type(cmd).__name__
+            profiler.command = name
+            started = time.perf_counter()
+            HANDLERS[type(cmd)](state, cmd)
+            ended = time.perf_counter()
+            args = {'line': cmd.lineno}
+            if hasattr(cmd, 'item_id'):
+                args['item_id'] = cmd.item_id
+            profiler.record(name, 'command', started, ended, args)
+            profiler.add(name, count=1, wall_s=ended - started)
+        count += 1
+    return count
+
+
+class SegmentState(CanvasState):
+    """并行执行时一个片段的画布状态：saveCanvas先写入临时文件，由主进程按顺序改名"""
+
+    def __init__(self, output_dir, cache, index, writer, memmap=False):
+        super().__init__(output_dir, cache, writer=writer, memmap=memmap)
+        self.index = index
+        self.saved = []  # [(临时文件路径, 最终文件路径)]
+
+    def output_path(self, name):
+        final = super().output_path(name)
+        # 临时文件与最终文件在同一目录，name可以带子目录
+        temp = os.path.join(os.path.dirname(final), '.%s.%d.%d.tmp' % (
+            os.path.basename(final), self.index, len(self.saved)))
+        self.saved.append((temp, final))
+        return temp
+
+
+def split_segments(commands):
+    """在每个resetCanvas处切分命令流，各片段的场景互不相关，只有画笔颜色会延续到后面的片段
+
+    :param commands: (iterable) 命令记录
+    :return: (generator) (片段的命令列表, 片段开始时的画笔颜色)
+    """
+    pen_color = (0, 0, 0)
+    segment, segment_color = [], pen_color
+    try:
+        for cmd in commands:
+            if type(cmd) is ResetCanvas and segment:
+                yield segment, segment_color
+                segment, segment_color = [], pen_color
+            if type(cmd) is SetColor:
+                pen_color = (cmd.r, cmd.g, cmd.b)
+            segment.append(cmd)
+    except CommandError:
+        # 出错行之前的命令在串行执行时已经生效
+        if segment:
+            yield segment, segment_color
+        raise
+    if segment:
+        yield segment, segment_color
+
+
+def run_segment(index, commands, pen_color, output_dir, cache_bytes, image_format='bmp', compress_level=6,
+                memmap=False):
+    """在工作进程中执行一个片段，图像在返回前同步写完
+
+    :return: (list of (str, str), tuple or None) 已保存的 (临时文件, 最终文件)，
+        以及出错时的 (行号, 错误信息)；任何异常都在这里转换为出错的命令的行号和信息，交给主进程处理
+    """
+    cache = PixelCache(cache_bytes) if cache_bytes > 0 else None
+    state = SegmentState(output_dir, cache, index,
+                         ImageWriter(image_format, compress_level, threads=0), memmap)
+    state.pen_color[:] = pen_color
+    current = None
+
+    def track():
+        nonlocal current
+        for current in commands:
+            yield current
+
+    try:
+        run_commands(track(), state)
+    except Exception as e:
+        if isinstance(e, CommandError):
+            segment_error = (e.lineno, e.message)
+        else:
+            segment_error = (current.lineno, '%s: %s' % (type(e).__name__, e))
+        # 写入失败的图像没有临时文件
+        return [(temp, final) for temp, final in state.saved if os.path.exists(temp)], segment_error
+    return state.saved, None
+
+
+def run_parallel(commands, output_dir, jobs, cache_bytes=0, image_format='bmp', compress_level=6,
+                 memmap=False):
+    """用进程池并行执行各个resetCanvas片段，输出文件和错误与串行执行完全相同
+
+    片段的结果按输入顺序提交：临时文件依次改名为最终文件名，因此同名的saveCanvas仍是后写的覆盖先写的；
+    某个片段出错时，它之前的输出全部保留，之后的片段的输出全部丢弃
+
+    :param commands: (iterable) 命令记录
+    :param output_dir: (str) 输出目录
+    :param jobs: (int) 进程数
+    :param cache_bytes: (int) 每个进程的图元像素缓存上限，0表示不使用缓存
+    :param image_format: (str) 输出图像格式
+    :param compress_level: (int) png的压缩级别
+    :param memmap: (bool) 是否使用磁盘映射画布
+    :return: (int) 执行的命令数
+    """
+    count = 0
+    error = None     # 最早出错的命令
+    failed = False   # 是否已有片段执行出错，之后的片段的输出都要丢弃
+    pending = deque()  # (future, 片段命令数)，按片段顺序排列
+
+    def collect(future, size):
+        nonlocal count, error, failed
+        try:
+            saved, segment_error = future.result()
+        except Exception as e:
+            # 工作进程异常退出等，片段的临时文件无从得知；继续收集其余片段，丢弃它们的输出
+            if not failed:
+                error = e
+                failed = True
+            return
+        if failed:
+            for temp, _ in saved:
+                os.remove(temp)
+            return
+        for temp, final in saved:
+            os.replace(temp, final)
+        if segment_error is not None:
+            error = CommandError(*segment_error)
+            failed = True
+        else:
+            count += size
+
+    with ProcessPoolExecutor(jobs) as executor:
+        segments = split_segments(commands)
+        index = 0
+        while not failed:
+            try:
+                segment, pen_color = next(segments)
+            except StopIteration:
+                break
+            except CommandError as e:
+                # 解析错误位于所有已提交的片段之后，这些片段的输出仍要保留
+                error = e
+                break
+            pending.append((executor.submit(
+                run_segment, index, segment, pen_color, output_dir, cache_bytes,
+                image_format, compress_level, memmap), len(segment)))
+            index += 1
+            # 限制同时在途的片段数，使内存占用与脚本长度无关
+            while len(pending) > 2 * jobs:
+                collect(*pending.popleft())
+        while pending:
+            collect(*pending.popleft())
+    if error is not None:
+        raise error
+    return count
+
+
 if __name__ == '__main__':
-    input_file = sys.argv[1]
-    output_dir = sys.argv[2]
+    parser = argparse.ArgumentParser()
+    parser.add_argument('input_path')
+    parser.add_argument('output_dir')
+    parser.add_argument('--cache-mb', type=float, default=256,
+                        help='图元像素缓存的上限（MB），0表示不使用缓存')
+    parser.add_argument('--cache-stats', action='store_true',
+                        help='结束时输出缓存命中情况')
+    parser.add_argument('--stats', action='store_true',
+                        help='结束时输出命令数和每秒执行的命令数')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='并行执行各resetCanvas片段的进程数，1表示串行执行')
+    parser.add_argument('--tile-jobs', type=int, default=1,
+                        help='saveCanvas分块并行光栅化的进程数，1表示不分块，适用于很大的画布')
+    parser.add_argument('--tile-size', type=int, default=1024,
+                        help='分块光栅化的分块边长')
+    parser.add_argument('--format', choices=ImageWriter.FORMATS, default='bmp',
+                        help='saveCanvas输出的图像格式')
+    parser.add_argument('--compress-level', type=int, default=6, choices=range(10),
+                        metavar='{0..9}', help='png的压缩级别')
+    parser.add_argument('--canvas', choices=('memory', 'memmap'), default='memory',
+                        help='画布放在内存中，或映射到输出目录下的文件（BMP布局，保存bmp时零拷贝）')
+    parser.add_argument('--profile', metavar='JSON',
+                        help='把每条命令、每个图元的耗时和像素数写成trace event格式的JSON')
+    parser.add_argument('--writers', type=int, default=2,
+                        help='后台编码、写入图像的线程数，0表示同步写入')
+    args = parser.parse_args()
+    if args.jobs > 1 and args.tile_jobs > 1:
+        parser.error('--jobs and --tile-jobs cannot be used together')
+    if args.jobs > 1 and args.profile:
+        parser.error('--profile requires --jobs 1')
+    input_file = args.input_path
+    output_dir = args.output_dir
     #input_file = '/home/cg/cg2020a/CG_demo/input.txt'
     #output_dir = '/home/cg/cg2020a/CG_demo/output_dir'
     os.makedirs(output_dir, exist_ok=True)
 
-    item_dict = {}
-    pen_color = np.zeros(3, np.uint8)
-    width = 0
-    height = 0
-
-    with open(input_file, 'r') as fp:
-        line = fp.readline()
-        while line:
-            line = line.strip().split(' ')
-            if line[0] == 'resetCanvas':
-                width = int(line[1])
-                height = int(line[2])
-                item_dict = {}
-            elif line[0] == 'saveCanvas':
-                save_name = line[1]
-                canvas = np.zeros([height, width, 3], np.uint8)
-                canvas.fill(255)
-                for item_type, p_list, algorithm, color in item_dict.values():
-                    if item_type == 'line':
-                        pixels = alg.draw_line(p_list, algorithm)
-                        for x, y in pixels:
-                            canvas[y, x] = color
-                    elif item_type == 'polygon':
-                        pixels = alg.draw_polygon(p_list, algorithm)
-                        for x, y in pixels:
-                            canvas[y, x] = color
-                    elif item_type == 'ellipse':
-                        pixels = alg.draw_ellipse(p_list)
-                        for x, y in pixels:
-                            canvas[y, x] = color
-                    elif item_type == 'curve':
-                        pixels = alg.draw_curve(p_list, algorithm)
-                        for x, y in pixels:
-                            canvas[y, x] = color
-                Image.fromarray(canvas).save(os.path.join(
-                    output_dir, save_name + '.bmp'), 'bmp')
-            elif line[0] == 'setColor':
-                pen_color[0] = int(line[1])
-                pen_color[1] = int(line[2])
-                pen_color[2] = int(line[3])
-            elif line[0] == 'drawLine':
-                item_id = line[1]
-                x0 = int(line[2])
-                y0 = int(line[3])
-                x1 = int(line[4])
-                y1 = int(line[5])
-                algorithm = line[6]
-                item_dict[item_id] = ['line', [[x0, y0], [x1, y1]],
-                                      algorithm, np.array(pen_color)]
-            elif line[0] == 'drawPolygon':
-                item_id = line[1]
-                algorithm = line[-1]
-                p_list = []
-                for i in range((len(line) - 3) // 2):
-                    x0 = int(line[2 + i * 2])
-                    y0 = int(line[2 + i * 2 + 1])
-                    p_list.append([x0, y0])
-                item_dict[item_id] = [
-                    'polygon', p_list, algorithm, np.array(pen_color)]
-            elif line[0] == 'drawEllipse':
-                item_id = line[1]
-                x0 = int(line[2])
-                y0 = int(line[3])
-                x1 = int(line[4])
-                y1 = int(line[5])
-                item_dict[item_id] = ['ellipse', [[x0, y0], [x1, y1]],
-                                      'middlecircle', np.array(pen_color)]
-            elif line[0] == 'drawCurve':
-                item_id = line[1]
-                algorithm = line[-1]
-                p_list = []
-                for i in range((len(line) - 3) // 2):
-                    x0 = int(line[2 + i * 2])
-                    y0 = int(line[2 + i * 2 + 1])
-                    p_list.append([x0, y0])
-                item_dict[item_id] = [
-                    'curve', p_list, algorithm, np.array(pen_color)]
-            elif line[0] == 'translate':
-                item_id = line[1]
-                dx = int(line[2])
-                dy = int(line[3])
-                item_dict[item_id][1] = alg.translate(
-                    item_dict[item_id][1], dx, dy)
-            elif line[0] == 'rotate':
-                item_id = line[1]
-                x = int(line[2])
-                y = int(line[3])
-                r = int(line[4])
-                item_dict[item_id][1] = alg.rotate(
-                    item_dict[item_id][1], x, y, r)
-            elif line[0] == 'scale':
-                item_id = line[1]
-                x = int(line[2])
-                y = int(line[3])
-                s = float(line[4])
-                item_dict[item_id][1] = alg.scale(
-                    item_dict[item_id][1], x, y, s)
-            elif line[0] == 'clip':
-                item_id = line[1]
-                x_min = int(line[2])
-                y_min = int(line[3])
-                x_max = int(line[4])
-                y_max = int(line[5])
-                algorithm = line[6]
-                item_dict[item_id][1] = alg.clip(
-                    item_dict[item_id][1], x_min, y_min, x_max, y_max, algorithm)
-            ...
-
-            line = fp.readline()
+    cache_bytes = int(args.cache_mb * 1024 * 1024)
+    cache = PixelCache(cache_bytes) if cache_bytes > 0 and args.jobs <= 1 else None
+    tile_executor = ProcessPoolExecutor(args.tile_jobs) if args.tile_jobs > 1 else None
+    writer = ImageWriter(args.format, args.compress_level, args.writers)
+    memmap = args.canvas == 'memmap'
+    profiler = Profiler() if args.profile else None
+    state = CanvasState(output_dir, cache, tile_executor, args.tile_size, writer, memmap, profiler)
+
+    start = time.perf_counter()
+    try:
+        try:
+            with open(input_file, 'r') as fp:
+                if args.jobs > 1:
+                    count = run_parallel(parse_commands(fp), output_dir, args.jobs, cache_bytes,
+                                         args.format, args.compress_level, memmap)
+                else:
+                    count = run_commands(parse_commands(fp), state)
+        finally:
+            # 出错时已经提交的图像也要写完；更早的saveCanvas写入失败时，报告的是它的错误
+            writer.close()
+            if tile_executor is not None:
+                tile_executor.shutdown()
+            if profiler is not None:
+                profiler.save(args.profile)
+    except CommandError as e:
+        print('%s:%d: %s' % (input_file, e.lineno, e.message), file=sys.stderr)
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+
+    if args.stats:
+        print('%d commands in %.3f s (%.0f commands/s)' %
+              (count, elapsed, count / elapsed if elapsed > 0 else 0), file=sys.stderr)
+    if args.cache_stats and cache is not None:
+        print('cache: %d hits, %d misses, %d bytes' %
+              (cache.hits, cache.misses, cache.nbytes), file=sys.stderr)
@@ -3,6 +3,7 @@
 
 import sys
 import cg_algorithms as alg
+import cg_algorithms_np as alg_np
 from typing import Optional
 from PyQt5.QtWidgets import (
     QApplication,
@@ -12,6 +13,7 @@ from PyQt5.QtWidgets import (
     QGraphicsView,
     QGraphicsItem,
     QListWidget,
+    QListWidgetItem,
     QHBoxLayout,
     QWidget,
     QStyleOptionGraphicsItem,
@@ -22,12 +24,140 @@ from PyQt5.QtWidgets import (
     QFormLayout,
     QLabel,
     QFileDialog,
+    QAbstractItemView,
 )
-from PyQt5.QtGui import QPainter, QMouseEvent, QColor, QWheelEvent
-from PyQt5.QtCore import QRectF, Qt, QPoint
+from PyQt5.QtGui import QPainter, QMouseEvent, QColor, QWheelEvent, QPolygon
+from PyQt5.QtCore import QRectF, Qt, QPoint, QItemSelectionModel
 import numpy as np
 
 
+# 控制点标记相对控制点的偏移，与逐点绘制时的图案相同
+MARKER_OFFSETS = np.array(
+    [[dx, dy] for i in range(3) for dx, dy in (
+        (-i, 0), (i, 0), (0, -i), (0, i), (-i, -i), (i, i), (i, -1), (-i, 1))] + [[0, 0]])
+
+
+def to_polygon(points):
+    """把像素坐标列表转换为QPolygon，以便一次drawPoints调用画出全部像素"""
+    if len(points) == 0:
+        return QPolygon()
+    return QPolygon(np.asarray(points, dtype=np.int64).ravel().tolist())
+
+
+class GridIndex:
+    """
+    图元包围盒的均匀网格索引，用于点选和框选时只检查附近的图元
+    """
+
+    def __init__(self, cell_size=64):
+        """
+        :param cell_size: (int) 网格边长
+        """
+        self.cell_size = cell_size
+        self._cells = {}   # (cx, cy) -> 与该格相交的图元ID集合
+        self._rects = {}   # 图元ID -> (x_min, y_min, x_max, y_max)
+        self._order = {}   # 图元ID -> 插入顺序，越大越靠上
+        self._count = 0
+
+    def __len__(self):
+        return len(self._rects)
+
+    def _cell_range(self, x_min, y_min, x_max, y_max):
+        size = self.cell_size
+        for cx in range(int(x_min // size), int(x_max // size) + 1):
+            for cy in range(int(y_min // size), int(y_max // size) + 1):
+                yield cx, cy
+
+    def update(self, item_id, rect: QRectF):
+        """
+        插入图元或更新图元的包围盒，只改动新旧包围盒覆盖的网格
+
+        :param item_id: (str) 图元ID
+        :param rect: (QRectF) 图元包围盒，为空时从索引中移除
+        """
+        if rect is None or rect.isEmpty():
+            self.remove(item_id)
+            return
+        box = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        old = self._rects.get(item_id)
+        if old == box:
+            return
+        if old is not None:
+            self._discard(item_id, old)
+        else:
+            self._order[item_id] = self._count
+            self._count += 1
+        self._rects[item_id] = box
+        for cell in self._cell_range(*box):
+            self._cells.setdefault(cell, set()).add(item_id)
+
+    def _discard(self, item_id, box):
+        for cell in self._cell_range(*box):
+            ids = self._cells.get(cell)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self._cells[cell]
+
+    def remove(self, item_id):
+        box = self._rects.pop(item_id, None)
+        if box is not None:
+            self._discard(item_id, box)
+            del self._order[item_id]
+
+    def clear(self):
+        self._cells.clear()
+        self._rects.clear()
+        self._order.clear()
+        self._count = 0
+
+    def _candidates(self, x_min, y_min, x_max, y_max):
+        found = set()
+        for cell in self._cell_range(x_min, y_min, x_max, y_max):
+            ids = self._cells.get(cell)
+            if ids:
+                found |= ids
+        return found
+
+    def _sorted(self, ids):
+        return sorted(ids, key=self._order.__getitem__, reverse=True)
+
+    def query_point(self, x, y, tolerance=0):
+        """
+        查询包围盒（外扩tolerance后）包含某点的图元
+
+        :param x: (int) 点的x坐标
+        :param y: (int) 点的y坐标
+        :param tolerance: (int) 容差
+        :return: (list of str) 图元ID，按从上到下的顺序排列
+        """
+        hits = []
+        for item_id in self._candidates(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            x_min, y_min, x_max, y_max = self._rects[item_id]
+            if x_min - tolerance <= x <= x_max + tolerance and y_min - tolerance <= y <= y_max + tolerance:
+                hits.append(item_id)
+        return self._sorted(hits)
+
+    def query_rect(self, x_min, y_min, x_max, y_max, contained=False):
+        """
+        查询包围盒与矩形相交（或被矩形完全包含）的图元
+
+        :param x_min, y_min, x_max, y_max: (int) 查询矩形
+        :param contained: (bool) 为True时只返回包围盒完全落在矩形内的图元
+        :return: (list of str) 图元ID，按从上到下的顺序排列
+        """
+        hits = []
+        for item_id in self._candidates(x_min, y_min, x_max, y_max):
+            b_x_min, b_y_min, b_x_max, b_y_max = self._rects[item_id]
+            if contained:
+                ok = x_min <= b_x_min and b_x_max <= x_max and y_min <= b_y_min and b_y_max <= y_max
+            else:
+                ok = b_x_min <= x_max and x_min <= b_x_max and b_y_min <= y_max and y_min <= b_y_max
+            if ok:
+                hits.append(item_id)
+        return self._sorted(hits)
+
+
 # https://mp.weixin.qq.com/s/Wy1iTYoX7_O81ChMflXXfg
 
 class MyCanvas(QGraphicsView):
@@ -41,6 +171,9 @@ class MyCanvas(QGraphicsView):
         self.list_widget = None
         self.item_dict = {}
         self.selected_id = ''
+        self.selected_ids = []   # 框选得到的图元
+        self.index = GridIndex()
+        self.list_items = {}     # 图元ID -> 列表中对应的QListWidgetItem
 
         self.status = ''
         self.temp_algorithm = ''
@@ -61,13 +194,51 @@ class MyCanvas(QGraphicsView):
         self.color = QColor(0, 0, 0)
         self._item = None
 
+    def repaint_items(self, *items):
+        """只重绘给定图元新旧包围盒（含选中框和控制点标记）的并集"""
+        rect = QRectF()
+        for item in items:
+            if item is not None:
+                rect = rect.united(item.damage())
+        if not rect.isEmpty():
+            self.updateScene([rect])
+
+    def update_index(self, item_id):
+        self.index.update(item_id, self.item_dict[item_id].boundingRect())
+
+    def add_list_item(self, item_id):
+        self.list_items[item_id] = QListWidgetItem(item_id, self.list_widget)
+
+    def clear_items(self):
+        self.item_dict = {}
+        self.list_items = {}
+        self.selected_id = ''
+        self.selected_ids = []
+        self.index.clear()
+
+    def item_at(self, x, y, tolerance=3):
+        """
+        点选：返回离点击位置tolerance个像素以内、最上层的图元ID
+
+        :param x: (int) 点击位置x坐标
+        :param y: (int) 点击位置y坐标
+        :param tolerance: (int) 容差
+        :return: (str) 图元ID，没有命中时为''
+        """
+        for item_id in self.index.query_point(x, y, tolerance):
+            pixels = np.asarray(self.item_dict[item_id].pixels()).reshape(-1, 2)
+            if len(pixels) > 0 and (np.abs(pixels - [x, y]).max(axis=1) <= tolerance).any():
+                return item_id
+        return ''
+
     def status_change(self):
         if self.is_polygon_drawing:
             self.temp_item.p_list.append(self.temp_item.p_list[0])
-            self.updateScene([self.sceneRect()])
+            self.repaint_items(self.temp_item)
         if self.is_polygon_drawing or self.is_curve_drawing:
             self.item_dict[self.temp_id] = self.temp_item
-            self.list_widget.addItem(self.temp_id)
+            self.update_index(self.temp_id)
+            self.add_list_item(self.temp_id)
             self.finish_draw()
             self.is_polygon_drawing = False
             self.is_curve_drawing = False
@@ -97,6 +268,9 @@ class MyCanvas(QGraphicsView):
         self.temp_algorithm = algorithm
         self.temp_id = item_id
 
+    def start_select(self):
+        self.status = 'select'
+
     def start_translate(self):
         self.status = 'translate'
         self.temp_item = self.item_dict[self.selected_id]
@@ -119,20 +293,40 @@ class MyCanvas(QGraphicsView):
         self.temp_id = self.main_window.get_id()
 
     def clear_selection(self):
-        if self.selected_id != '':
-            self.item_dict[self.selected_id].selected = False
-            self.selected_id = ''
+        """取消所有选中，并重绘被取消选中的图元以擦除选中框和控制点标记"""
+        items = [self.item_dict[item_id] for item_id in {self.selected_id, *self.selected_ids}
+                 if item_id in self.item_dict]
+        for item in items:
+            item.selected = False
+        self.selected_id = ''
+        self.selected_ids = []
+        self.repaint_items(*items)
+
+    def select_items(self, item_ids):
+        """框选：高亮所有选中的图元，最上层的图元作为当前图元供编辑操作使用"""
+        self.list_widget.clearSelection()
+        self.clear_selection()
+        if not item_ids:
+            return
+        for item_id in item_ids:
+            self.item_dict[item_id].selected = True
+            self.list_items[item_id].setSelected(True)
+        self.selected_ids = list(item_ids)
+        self.list_widget.setCurrentItem(self.list_items[item_ids[0]], QItemSelectionModel.Select)
+        self.selected_id = item_ids[0]
+        self.main_window.statusBar().showMessage('图元选择： %s' % ', '.join(item_ids))
+        self.repaint_items(*(self.item_dict[item_id] for item_id in item_ids))
 
     def selection_changed(self, selected):
+        if selected == '':
+            return
         self.main_window.statusBar().showMessage('图元选择： %s' % selected)
-        if self.selected_id != '':
-            self.item_dict[self.selected_id].selected = False
-            self.item_dict[self.selected_id].update()
+        if selected not in self.selected_ids:
+            self.clear_selection()
         self.selected_id = selected
         self.item_dict[selected].selected = True
-        self.item_dict[selected].update()
         self.status = ''
-        self.updateScene([self.sceneRect()])
+        self.repaint_items(self.item_dict[selected])
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
         pos = self.mapToScene(event.localPos().toPoint())
@@ -186,12 +380,18 @@ class MyCanvas(QGraphicsView):
                 self._item = MyItem('clip_rect', self.status, [
                     [x, y], [x, y]], '', QColor(0, 0, 0))
                 self.scene().addItem(self._item)
+            elif self.status == 'select':
+                self.init_x, self.init_y = x, y
+                self.x_min, self.y_min, self.x_max, self.y_max = x, y, x, y
+                self._item = MyItem('select_rect', 'clip', [
+                    [x, y], [x, y]], '', QColor(0, 0, 0))
+                self.scene().addItem(self._item)
 
             elif self.status == 'modify':  # TODO
                 pass
         else:
             pass
-        self.updateScene([self.sceneRect()])
+        self.repaint_items(self.temp_item, self._item)
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         pos = self.mapToScene(event.localPos().toPoint())
@@ -206,9 +406,9 @@ class MyCanvas(QGraphicsView):
         elif self.status == 'curve' and self.is_curve_drawing:
             self.temp_item.p_list[-1] = [x, y]
         elif self.status == 'translate':
-            self.temp_item.p_list = alg.translate(
-                self.p_l, x - self.init_x, y - self.init_y)
-        elif self.status == 'clip':
+            self.temp_item.p_list = alg_np.translate(
+                self.p_l, x - self.init_x, y - self.init_y).tolist()
+        elif self.status == 'clip' or self.status == 'select' and self._item is not None:
             self._item.p_list[1] = [x, y]
             if self.init_x < x:
                 self.x_min, self.x_max = self.init_x, x
@@ -222,7 +422,7 @@ class MyCanvas(QGraphicsView):
         elif self.status == 'modify':  # TODO
             pass
 
-        self.updateScene([self.sceneRect()])
+        self.repaint_items(self.temp_item, self._item)
         super().mouseMoveEvent(event)
 
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
@@ -230,27 +430,32 @@ class MyCanvas(QGraphicsView):
             return
         if self.status == 'line' and self.is_line_drawing:
             self.item_dict[self.temp_id] = self.temp_item
-            self.list_widget.addItem(self.temp_id)
+            self.update_index(self.temp_id)
+            self.add_list_item(self.temp_id)
             self.is_line_drawing = False
             self.finish_draw()
         elif self.status == 'polygon':
             pass
         elif self.status == 'ellipse' and self.is_ellipse_drawing:
             self.item_dict[self.temp_id] = self.temp_item
-            self.list_widget.addItem(self.temp_id)
+            self.update_index(self.temp_id)
+            self.add_list_item(self.temp_id)
             self.is_ellipse_drawing = False
             self.finish_draw()
         elif self.status == 'curve':
             pass
         elif self.status == 'translate':
             self.item_dict[self.selected_id] = self.temp_item
+            self.update_index(self.selected_id)
         elif self.status == 'rotate':
             self.is_rotate = False
             self.item_dict[self.selected_id] = self.temp_item
+            self.update_index(self.selected_id)
             self.scene().removeItem(self._item)
         elif self.status == 'scale':
             self.is_sca1e = False
             self.item_dict[self.selected_id] = self.temp_item
+            self.update_index(self.selected_id)
             self.scene().removeItem(self._item)
         elif self.status == 'clip':
             print(self.temp_item.p_list)
@@ -263,11 +468,21 @@ class MyCanvas(QGraphicsView):
                 self.x_max,
                 self.y_max,
                 self.temp_algorithm)
-
+            self.update_index(self.selected_id)
             self.scene().removeItem(self._item)
+        elif self.status == 'select' and self._item is not None:
+            self.scene().removeItem(self._item)
+            self._item = None
+            if self.x_max - self.x_min <= 3 and self.y_max - self.y_min <= 3:
+                item_id = self.item_at(self.init_x, self.init_y)
+                self.select_items([item_id] if item_id else [])
+            else:
+                self.select_items(self.index.query_rect(
+                    self.x_min, self.y_min, self.x_max, self.y_max, contained=True))
+            self.status = 'select'
         elif self.status == 'modify':  # TODO
             pass
-        self.updateScene([self.sceneRect()])
+        self.repaint_items(self.temp_item, self._item)
         super().mouseReleaseEvent(event)
 
     def wheelEvent(self, event: QWheelEvent) -> None:
@@ -275,13 +490,63 @@ class MyCanvas(QGraphicsView):
         angle /= 60
 
         if self.status == 'rotate' and self.is_rotate:
-            self.temp_item.p_list = alg.rotate(
-                self.temp_item.p_list, self.init_x, self.init_y, angle.y())
+            self.temp_item.p_list = alg_np.rotate(
+                self.temp_item.p_list, self.init_x, self.init_y, angle.y()).tolist()
         elif self.status == 'scale' and self.is_sca1e:
             s = 1 + 0.1 * angle.y() / 2
-            self.temp_item.p_list = alg.scale(
-                self.temp_item.p_list, self.init_x, self.init_y, s)
-        self.updateScene([self.sceneRect()])
+            self.temp_item.p_list = alg_np.scale(
+                self.temp_item.p_list, self.init_x, self.init_y, s).tolist()
+        self.repaint_items(self.temp_item, self._item)
+
+
+class PointList(list):
+    """
+    图元参数列表，任何原地修改之前都会通知所属图元，以便记录旧包围盒并重新光栅化
+    """
+
+    def __init__(self, iterable=(), on_change=None):
+        super().__init__(iterable)
+        self.on_change = on_change
+
+    def _changed(self):
+        if self.on_change is not None:
+            self.on_change()
+
+    def __setitem__(self, index, value):
+        self._changed()
+        super().__setitem__(index, value)
+
+    def __delitem__(self, index):
+        self._changed()
+        super().__delitem__(index)
+
+    def __iadd__(self, other):
+        self._changed()
+        return super().__iadd__(other)
+
+    def append(self, value):
+        self._changed()
+        super().append(value)
+
+    def extend(self, iterable):
+        self._changed()
+        super().extend(iterable)
+
+    def insert(self, index, value):
+        self._changed()
+        super().insert(index, value)
+
+    def pop(self, index=-1):
+        self._changed()
+        return super().pop(index)
+
+    def remove(self, value):
+        self._changed()
+        super().remove(value)
+
+    def clear(self):
+        self._changed()
+        super().clear()
 
 
 class MyItem(QGraphicsItem):
@@ -309,6 +574,11 @@ class MyItem(QGraphicsItem):
         :param parent:
         """
         super().__init__(parent)
+        self.dirty = True           # 光栅化结果是否需要重新计算
+        self._damaged = True        # 自上次重绘以来外观是否改变
+        self._last_rect = QRectF()  # 上次重绘时占据的区域
+        self._pixels = []           # 缓存的光栅化结果
+        self._polygon = QPolygon()  # 缓存的光栅化结果，用于drawPoints
         self.id = item_id           # 图元ID
         self.item_type = item_type  # 图元类型，'line'、'polygon'、'ellipse'、'curve'等
         self.p_list = p_list        # 图元参数
@@ -316,20 +586,93 @@ class MyItem(QGraphicsItem):
         self.selected = False
         self.color = color
 
-    def drawPoint(self, painter: QPainter, x):
+    def mark_dirty(self):
+        self.prepareGeometryChange()
+        self.dirty = True
+        self._damaged = True
+
+    def damage(self) -> QRectF:
+        """
+        返回自上次调用以来需要重绘的区域：旧区域与新区域的并集，外观未改变时为空
+
+        :return: (QRectF) 场景坐标下的脏矩形
+        """
+        if not self._damaged:
+            return QRectF()
+        rect = self.boundingRect()
+        # 选中框和控制点标记会超出包围盒几个像素
+        rect = rect.adjusted(-3, -3, 3, 3) if rect is not None and not rect.isEmpty() else QRectF()
+        dirty = self._last_rect.united(rect)
+        self._last_rect = rect
+        self._damaged = False
+        return dirty
+
+    @property
+    def selected(self):
+        return self._selected
+
+    @selected.setter
+    def selected(self, selected):
+        self._selected = selected
+        self._damaged = True
+
+    @property
+    def p_list(self):
+        return self._p_list
+
+    @p_list.setter
+    def p_list(self, p_list):
+        self.mark_dirty()
+        self._p_list = PointList(p_list, self.mark_dirty)
+
+    @property
+    def algorithm(self):
+        return self._algorithm
+
+    @algorithm.setter
+    def algorithm(self, algorithm):
+        self._algorithm = algorithm
+        self.dirty = True
+        self._damaged = True
+
+    @property
+    def color(self):
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        self._color = QColor(color)
+        self.dirty = True
+        self._damaged = True
+
+    def pixels(self):
+        """图元的光栅化结果，只在p_list、算法或颜色改变后重新计算"""
+        if self.dirty:
+            if self.item_type == 'line':
+                self._pixels = alg.draw_line(self.p_list, self.algorithm)
+            elif self.item_type == 'polygon' and self.algorithm == 'Scanline':
+                self._pixels = alg_np.fill_polygon(self.p_list)
+            elif self.item_type == 'polygon':
+                self._pixels = alg.draw_polygon_gui(self.p_list, self.algorithm)
+            elif self.item_type == 'ellipse':
+                self._pixels = alg_np.draw_ellipse(self.p_list)
+            elif self.item_type == 'curve':
+                self._pixels = alg_np.draw_curve(self.p_list, self.algorithm)
+            else:
+                self._pixels = []
+            self._polygon = to_polygon(self._pixels)
+            self.dirty = False
+        return self._pixels
+
+    def points(self) -> QPolygon:
+        self.pixels()
+        return self._polygon
+
+    def drawPoint(self, painter: QPainter, *points):
+        """用一次drawPoints调用画出所有控制点的标记"""
         painter.setPen(QColor(0, 0, 0))
-        point_range = 2
-        i = 1
-        for i in range(point_range + 1):
-            painter.drawPoint(x[0] - i, x[1])
-            painter.drawPoint(x[0] + i, x[1])
-            painter.drawPoint(x[0], x[1] - i)
-            painter.drawPoint(x[0], x[1] + i)
-            painter.drawPoint(x[0] - i, x[1] - i)
-            painter.drawPoint(x[0] + i, x[1] + i)
-            painter.drawPoint(x[0] + i, x[1] - 1)
-            painter.drawPoint(x[0] - i, x[1] + 1)
-        painter.drawPoint(*x)
+        centers = np.asarray(points, dtype=np.int64).reshape(-1, 1, 2)
+        painter.drawPoints(to_polygon((centers + MARKER_OFFSETS).reshape(-1, 2)))
 
     def paint(
             self,
@@ -337,32 +680,21 @@ class MyItem(QGraphicsItem):
             option: QStyleOptionGraphicsItem,
             widget: Optional[QWidget] = ...) -> None:
         painter.setPen(self.color)
-        if self.item_type == 'line':
-            item_pixels = alg.draw_line(self.p_list, self.algorithm)
-        elif self.item_type == 'polygon':
-            item_pixels = alg.draw_polygon_gui(self.p_list, self.algorithm)
-        elif self.item_type == 'ellipse':
-            item_pixels = alg.draw_ellipse(self.p_list)
-        elif self.item_type == 'curve':
-            item_pixels = alg.draw_curve(self.p_list, self.algorithm)
-        elif self.item_type == 'clip':
+        if self.item_type == 'clip':
             painter.setPen(QColor(0, 0, 255))
             painter.drawRect(self.boundingRect())
-            item_pixels = []
         elif self.item_type == 'rotate':
             self.drawPoint(painter, self.p_list[0])
-            item_pixels = []
         elif self.item_type == 'scale':
             self.drawPoint(painter, self.p_list[0])
-            item_pixels = []
+        else:
+            painter.drawPoints(self.points())
 
-        for p in item_pixels:
-            painter.drawPoint(*p)
         if self.selected:
             painter.setPen(QColor(255, 0, 0))
             painter.drawRect(self.boundingRect())
-            for x in self.p_list:
-                self.drawPoint(painter, x)
+            if len(self.p_list) > 0:
+                self.drawPoint(painter, *self.p_list)
 
     def boundingRect(self) -> QRectF:
         if self.item_type == 'line':
@@ -410,10 +742,9 @@ class MyItem(QGraphicsItem):
             w = max(x0, x1) - x
             h = max(y0, y1) - y
             return QRectF(x - 1, y - 1, w + 2, h + 2)
-        elif self.item_type == 'rotate':
-            return QRectF()
-        elif self.item_type == 'scale':
-            return QRectF()
+        elif self.item_type == 'rotate' or self.item_type == 'scale':
+            x, y = self.p_list[0]
+            return QRectF(x - 2, y - 2, 4, 4)
 
 
 class MainWindow(QMainWindow):
@@ -428,6 +759,7 @@ class MainWindow(QMainWindow):
         # 使用QListWidget来记录已有的图元，并用于选择图元。注：这是图元选择的简单实现方法，更好的实现是在画布中直接用鼠标选择图元
         self.list_widget = QListWidget(self)
         self.list_widget.setMinimumWidth(200)
+        self.list_widget.setSelectionMode(QAbstractItemView.ExtendedSelection)
 
         # 使用QGraphicsView作为画布
         self.scene = QGraphicsScene(self)
@@ -453,11 +785,14 @@ class MainWindow(QMainWindow):
         polygon_menu = draw_menu.addMenu('多边形')
         polygon_dda_act = polygon_menu.addAction('DDA')
         polygon_bresenham_act = polygon_menu.addAction('Bresenham')
+        polygon_scanline_act = polygon_menu.addAction('扫描线填充')
         ellipse_act = draw_menu.addAction('椭圆')
         curve_menu = draw_menu.addMenu('曲线')
         curve_bezier_act = curve_menu.addAction('Bezier')
         curve_b_spline_act = curve_menu.addAction('B-spline')
+        curve_bezier_adaptive_act = curve_menu.addAction('Bezier（自适应）')
         edit_menu = menubar.addMenu('编辑')
+        select_act = edit_menu.addAction('选择')
         translate_act = edit_menu.addAction('平移')
         rotate_act = edit_menu.addAction('旋转')
         scale_act = edit_menu.addAction('缩放')
@@ -475,9 +810,12 @@ class MainWindow(QMainWindow):
         line_bresenham_act.triggered.connect(self.line_bresenham_action)
         polygon_dda_act.triggered.connect(self.polygon_dda_action)
         polygon_bresenham_act.triggered.connect(self.polygon_bresenham_action)
+        polygon_scanline_act.triggered.connect(self.polygon_scanline_action)
         ellipse_act.triggered.connect(self.ellipse_action)
         curve_bezier_act.triggered.connect(self.curve_bezier_action)
         curve_b_spline_act.triggered.connect(self.curve_b_spline_action)
+        curve_bezier_adaptive_act.triggered.connect(self.curve_bezier_adaptive_action)
+        select_act.triggered.connect(self.select_action)
         translate_act.triggered.connect(self.translate_action)
         rotate_act.triggered.connect(self.rotate_action)
         scale_act.triggered.connect(self.scale_action)
@@ -555,6 +893,7 @@ class MainWindow(QMainWindow):
             self.canvas_widget.setFixedSize(width, height)
             self.list_widget.clearSelection()
             self.canvas_widget.clear_selection()
+            self.canvas_widget.clear_items()
             self.scene.clear()
             self.list_widget.clear()
             self.item_cnt = 1
@@ -603,6 +942,13 @@ class MainWindow(QMainWindow):
         self.list_widget.clearSelection()
         self.canvas_widget.clear_selection()
 
+    def polygon_scanline_action(self):
+        self.item_cnt -= 1
+        self.canvas_widget.start_draw_polygon('Scanline', self.get_id())
+        self.statusBar().showMessage('扫描线算法填充多边形')
+        self.list_widget.clearSelection()
+        self.canvas_widget.clear_selection()
+
     def ellipse_action(self):
         self.item_cnt -= 1
         self.canvas_widget.start_draw_ellipse(self.get_id())
@@ -624,6 +970,17 @@ class MainWindow(QMainWindow):
         self.list_widget.clearSelection()
         self.canvas_widget.clear_selection()
 
+    def curve_bezier_adaptive_action(self):
+        self.item_cnt -= 1
+        self.canvas_widget.start_draw_curve('Bezier-adaptive', self.get_id())
+        self.statusBar().showMessage('自适应细分绘制Bezier曲线')
+        self.list_widget.clearSelection()
+        self.canvas_widget.clear_selection()
+
+    def select_action(self):
+        self.canvas_widget.start_select()
+        self.statusBar().showMessage('点击或框选图元')
+
     def translate_action(self):
         if self.canvas_widget.selected_id:
             self.canvas_widget.start_translate()